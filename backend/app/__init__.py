@@ -40,13 +40,18 @@ def create_app(config_name=None):
         os.makedirs(app.config['GALLERY_DATA_PATH'], exist_ok=True)
         os.makedirs(app.config['TEMP_UPLOAD_PATH'], exist_ok=True)
         os.makedirs(app.config['ZIP_OUTPUT_PATH'], exist_ok=True)
+        os.makedirs(app.config['BLOB_STORE_PATH'], exist_ok=True)
+        os.makedirs(app.config['DERIVATIVE_PATH'], exist_ok=True)
+        os.makedirs(app.config['AUDIT_ARCHIVE_PATH'], exist_ok=True)
+        os.makedirs(app.config['RESPONSIVE_CACHE_PATH'], exist_ok=True)
 
         db.create_all()
 
-        from app.api import galleries, images, admin, downloads
+        from app.api import galleries, images, admin, downloads, uploads
         app.register_blueprint(galleries.bp)
         app.register_blueprint(images.bp)
         app.register_blueprint(admin.bp)
         app.register_blueprint(downloads.bp)
+        app.register_blueprint(uploads.bp)
 
     return app
@@ -1,12 +1,21 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_user, logout_user, current_user
-from app import bcrypt
-from app.models import db, Admin, AuditLog, Gallery, Image
+from app import bcrypt, cache
+from app.models import db, Admin, Gallery, Image
 from app.utils.decorators import admin_required, audit_log
+from app.services.cache_namespaces import cache_stats
+from app.services.janitor import storage_report
+from app.services.audit_search import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, FILTER_COLUMNS, parse_timestamp, parse_cursor,
+    filtered_query, log_page, approximate_total
+)
+from app.services.audit_archive import continue_into_archive
 from sqlalchemy import func
 
 bp = Blueprint('admin', __name__, url_prefix='/api/auth')
 
+ARTIFACT_REPORT_TTL = 300
+
 
 @bp.route('/login', methods=['POST'])
 def login():
@@ -59,15 +68,18 @@ def get_current_admin():
 @admin_required
 def get_metrics():
     total_galleries = Gallery.query.count()
-    total_images = Image.query.count()
-    total_storage = db.session.query(func.sum(Image.file_size)).scalar() or 0
+    total_images, total_storage = db.session.query(
+        func.sum(Gallery.image_count), func.sum(Gallery.total_bytes)
+    ).one()
 
     recent_uploads = Image.query.order_by(Image.uploaded_at.desc()).limit(10).all()
 
     return jsonify({
         'total_galleries': total_galleries,
-        'total_images': total_images,
-        'total_storage': total_storage,
+        'total_images': int(total_images or 0),
+        'total_storage': int(total_storage or 0),
+        'cache': cache_stats(),
+        'artifacts': _artifact_report(),
         'recent_uploads': [{
             'id': img.id,
             'filename': img.original_filename,
@@ -76,31 +88,47 @@ def get_metrics():
     }), 200
 
 
+def _artifact_report():
+    report = cache.get('artifact_storage_report')
+    if report is None:
+        report = storage_report()
+        cache.set('artifact_storage_report', report, timeout=ARTIFACT_REPORT_TTL)
+    return report
+
+
 @bp.route('/admin/audit-logs', methods=['GET'])
 @admin_required
 def get_audit_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-
-    pagination = AuditLog.query.order_by(AuditLog.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-
-    logs = [{
-        'id': log.id,
-        'admin_id': log.admin_id,
-        'action': log.action,
-        'resource_type': log.resource_type,
-        'resource_id': log.resource_id,
-        'details': log.details,
-        'ip_address': log.ip_address,
-        'created_at': log.created_at.isoformat()
-    } for log in pagination.items]
+    limit = request.args.get('limit', request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int), type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    filters = {}
+    for name in FILTER_COLUMNS:
+        if request.args.get(name):
+            filters[name] = request.args.get(name, type=int if name.endswith('_id') else str)
+    if None in filters.values():
+        return jsonify({'error': 'Invalid filter value'}), 400
+
+    bounds = {name: parse_timestamp(request.args[name]) for name in ('since', 'until') if request.args.get(name)}
+    if None in bounds.values():
+        return jsonify({'error': 'since and until must be ISO 8601 timestamps'}), 400
+
+    cursor = None
+    if request.args.get('cursor'):
+        cursor = parse_cursor(request.args['cursor'])
+        if cursor is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    query = filtered_query(filters, **bounds)
+    logs, next_cursor = log_page(query, limit, cursor)
+    if next_cursor is None:
+        logs, next_cursor = continue_into_archive(logs, limit, filters, cursor=cursor, **bounds)
+    total, total_is_estimate = approximate_total(query, bool(filters or bounds))
 
     return jsonify({
         'logs': logs,
-        'total': pagination.total,
-        'page': pagination.page,
-        'per_page': pagination.per_page,
-        'pages': pagination.pages
+        'total': total,
+        'total_is_estimate': total_is_estimate,
+        'limit': limit,
+        'next_cursor': next_cursor
     }), 200
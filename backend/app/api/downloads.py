@@ -1,101 +1,146 @@
 import os
-import secrets
-from flask import Blueprint, request, jsonify, send_file, current_app, session
+import time
+from flask import Blueprint, Response, request, jsonify, current_app, session, stream_with_context
 from flask_login import current_user
 from redis import Redis
-from app.models import Gallery, Image
-from app.services.zip_generator import create_zip_task
+from stream_zip import stream_zip
+from app.models import Gallery
+from app.services.zip_generator import (
+    zip_entries, zip_members, zip_size, archive_scope, archive_fingerprint, cached_archive
+)
+from app.services.zip_jobs import (
+    ACTIVE_STATUSES, request_zip_build, get_task, update_task, cancel_task, task_progress
+)
 from app.services.audit_logger import log_action
+from app.services.janitor import record_access
+from app.utils.decorators import admin_required
+from app.utils.file_delivery import deliver_file
 
 bp = Blueprint('downloads', __name__, url_prefix='/api')
 
 
-@bp.route('/galleries/<slug>/download', methods=['POST'])
-def request_zip_download(slug):
+def _downloadable_gallery(slug):
     gallery = Gallery.query.filter_by(slug=slug).first()
     if not gallery:
-        return jsonify({'error': 'Gallery not found'}), 404
+        return None, (jsonify({'error': 'Gallery not found'}), 404)
 
     if not gallery.is_public and not session.get(f'gallery_auth:{gallery.id}'):
         if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+            return None, (jsonify({'error': 'Authentication required'}), 401)
 
     if not gallery.allow_download and not current_user.is_authenticated:
-        return jsonify({'error': 'Downloads not allowed for this gallery'}), 403
+        return None, (jsonify({'error': 'Downloads not allowed for this gallery'}), 403)
 
-    images = gallery.images.order_by(Image.order).all()
-    if not images:
-        return jsonify({'error': 'No images in gallery'}), 404
+    return gallery, None
 
-    task_id = secrets.token_urlsafe(16)
-
-    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
-    redis_client.setex(f'zip_task:{task_id}', 3600, 'pending')
-
-    create_zip_task(gallery, images, task_id, current_app.config['REDIS_URL'])
 
+def _log_download(gallery, details):
     if current_user.is_authenticated:
         log_action(
             admin_id=current_user.id,
             action='download_request',
             resource_type='gallery',
             resource_id=gallery.id,
-            details={'task_id': task_id, 'image_count': len(images)},
+            details=details,
             ip_address=request.remote_addr
         )
 
-    return jsonify({
-        'task_id': task_id,
-        'status': 'pending',
-        'message': 'ZIP creation started'
-    }), 202
+
+@bp.route('/galleries/<slug>/download', methods=['GET'])
+def stream_zip_download(slug):
+    gallery, error = _downloadable_gallery(slug)
+    if error:
+        return error
+
+    include_hidden = current_user.is_authenticated
+    entries = zip_entries(gallery, include_hidden)
+    if not entries:
+        return jsonify({'error': 'No images in gallery'}), 404
+
+    _log_download(gallery, {'streamed': True, 'image_count': len(entries)})
+
+    cached_path = cached_archive(gallery.id, archive_scope(include_hidden), archive_fingerprint(entries))
+    if cached_path:
+        record_access(cached_path)
+        return deliver_file(cached_path, mimetype='application/zip', as_attachment=True,
+                            download_name=f'{gallery.slug}.zip')
+
+    response = Response(stream_with_context(stream_zip(zip_members(entries))), mimetype='application/zip')
+    response.headers.set('Content-Disposition', 'attachment', filename=f'{gallery.slug}.zip')
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.content_length = zip_size(entries)
+    return response
+
+
+@bp.route('/galleries/<slug>/download', methods=['POST'])
+def request_zip_download(slug):
+    gallery, error = _downloadable_gallery(slug)
+    if error:
+        return error
+
+    include_hidden = current_user.is_authenticated
+    entries = zip_entries(gallery, include_hidden)
+    if not entries:
+        return jsonify({'error': 'No images in gallery'}), 404
+
+    task = request_zip_build(gallery, entries, archive_scope(include_hidden))
+    if task is None:
+        return jsonify({'error': 'Too many downloads are being prepared, try again shortly'}), 503
+
+    _log_download(gallery, {'task_id': task['task_id'], 'image_count': len(entries)})
+
+    return jsonify({'task_id': task['task_id'], **task_progress(task)}), 202
+
+
+def _load_task(task_id):
+    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
+    return redis_client, get_task(redis_client, task_id)
 
 
 @bp.route('/downloads/<task_id>/status', methods=['GET'])
 def get_zip_status(task_id):
-    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
-    status = redis_client.get(f'zip_task:{task_id}')
+    redis_client, task = _load_task(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
 
-    if not status:
+    if task['status'] in ACTIVE_STATUSES:
+        update_task(redis_client, task_id, polled_at=time.time())
+
+    response = task_progress(task)
+    if task['status'] == 'ready':
+        response['filename'] = task['download_name']
+    elif task['status'] in ('error', 'cancelled'):
+        response['error'] = task.get('error')
+
+    return jsonify(response), 500 if task['status'] == 'error' else 200
+
+
+@bp.route('/downloads/<task_id>', methods=['DELETE'])
+@admin_required
+def cancel_zip_task(task_id):
+    redis_client, task = _load_task(task_id)
+    if not task:
         return jsonify({'error': 'Task not found'}), 404
 
-    status_str = status.decode('utf-8')
-
-    if status_str.startswith('ready:'):
-        filename = status_str.split(':', 1)[1]
-        return jsonify({
-            'status': 'ready',
-            'filename': filename
-        }), 200
-    elif status_str.startswith('error:'):
-        error_msg = status_str.split(':', 1)[1]
-        return jsonify({
-            'status': 'error',
-            'error': error_msg
-        }), 500
-    else:
-        return jsonify({
-            'status': status_str
-        }), 200
+    if not cancel_task(redis_client, task_id):
+        return jsonify({'error': f"Task is already {task['status']}"}), 409
+
+    return jsonify({'message': 'Task cancelled'}), 200
 
 
 @bp.route('/downloads/<task_id>/file', methods=['GET'])
 def download_zip_file(task_id):
-    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
-    status = redis_client.get(f'zip_task:{task_id}')
-
-    if not status:
+    _, task = _load_task(task_id)
+    if not task:
         return jsonify({'error': 'Task not found'}), 404
 
-    status_str = status.decode('utf-8')
-
-    if not status_str.startswith('ready:'):
+    if task['status'] != 'ready':
         return jsonify({'error': 'ZIP file not ready'}), 400
 
-    filename = status_str.split(':', 1)[1]
-    zip_path = os.path.join(current_app.config['ZIP_OUTPUT_PATH'], filename)
+    zip_path = os.path.join(current_app.config['ZIP_OUTPUT_PATH'], task['filename'])
 
     if not os.path.exists(zip_path):
         return jsonify({'error': 'ZIP file not found'}), 404
 
-    return send_file(zip_path, mimetype='application/zip', as_attachment=True, download_name=filename)
+    record_access(zip_path)
+    return deliver_file(zip_path, mimetype='application/zip', as_attachment=True, download_name=task['download_name'])
@@ -6,11 +6,35 @@ from app import bcrypt, cache
 from app.models import db, Gallery, Image
 from app.utils.decorators import admin_required, audit_log
 from app.utils.helpers import slugify
+from app.services.gallery_manifest import (
+    PUBLIC_FIELDS, ADMIN_FIELDS, parse_fields, parse_page_size, parse_cursor, image_page
+)
+from app.services.blob_store import release_references, purge_unreferenced
+from app.services.cache_namespaces import namespaced_key, cached_get, invalidate
+from app.services.zip_generator import remove_archives
+from app.services.watermark import settings_dir, remove_stale_watermarks
+from app.services.derivatives import enqueue_watermarks, requeue_gallery_derivatives
 from flask import current_app
 
 bp = Blueprint('galleries', __name__)
 
 
+def _manifest_params(allowed_fields):
+    fields = parse_fields(request.args.get('fields'), allowed_fields)
+    if fields is None:
+        return None, 'Unknown field requested'
+
+    cursor = None
+    if request.args.get('cursor'):
+        cursor = parse_cursor(request.args['cursor'])
+        if cursor is None:
+            return None, 'Invalid cursor'
+
+    paginated = 'limit' in request.args or cursor is not None
+    limit = parse_page_size(request.args.get('limit', type=int)) if paginated else None
+    return (fields, limit, cursor), None
+
+
 @bp.route('/api/galleries', methods=['GET'])
 def list_public_galleries():
     galleries = Gallery.query.filter_by(is_public=True).order_by(Gallery.created_at.desc()).all()
@@ -19,7 +43,7 @@ def list_public_galleries():
         'id': g.id,
         'name': g.name,
         'slug': g.slug,
-        'image_count': g.image_count,
+        'image_count': g.visible_image_count,
         'hover_animation': g.hover_animation,
         'cover_image_id': g.cover_image_id,
         'created_at': g.created_at.isoformat()
@@ -35,7 +59,18 @@ def get_gallery_by_slug(slug):
     if not gallery.is_public and not session.get(f'gallery_auth:{gallery.id}'):
         return jsonify({'error': 'Authentication required', 'requires_password': True}), 401
 
-    images = gallery.images.filter_by(is_hidden=False).order_by(Image.order).all()
+    params, error = _manifest_params(PUBLIC_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    fields, limit, cursor = params
+
+    page_key = f"gallery_images:{','.join(fields)}:{limit}:{request.args.get('cursor', '')}"
+    images_key = namespaced_key(page_key, gallery_id=gallery.id)
+    page = cached_get(images_key)
+    if page is None:
+        images, next_cursor = image_page(gallery, fields, limit=limit, cursor=cursor)
+        page = {'images': images, 'next_cursor': next_cursor}
+        cache.set(images_key, page)
 
     return jsonify({
         'id': gallery.id,
@@ -44,15 +79,9 @@ def get_gallery_by_slug(slug):
         'is_public': gallery.is_public,
         'allow_download': gallery.allow_download,
         'thumbnail_only': gallery.thumbnail_only,
-        'image_count': len(images),
-        'images': [{
-            'id': img.id,
-            'filename': img.filename,
-            'original_filename': img.original_filename,
-            'width': img.width,
-            'height': img.height,
-            'order': img.order
-        } for img in images]
+        'image_count': gallery.visible_image_count,
+        'images': page['images'],
+        'next_cursor': page['next_cursor']
     }), 200
 
 
@@ -90,6 +119,8 @@ def list_all_galleries():
         'hover_animation': g.hover_animation,
         'cover_image_id': g.cover_image_id,
         'image_count': g.image_count,
+        'visible_image_count': g.visible_image_count,
+        'total_bytes': g.total_bytes,
         'owner_id': g.owner_id,
         'created_at': g.created_at.isoformat(),
         'updated_at': g.updated_at.isoformat()
@@ -146,7 +177,14 @@ def create_gallery():
 @admin_required
 def get_gallery(id):
     gallery = Gallery.query.get_or_404(id)
-    images = gallery.images.order_by(Image.order).all()
+
+    params, error = _manifest_params(ADMIN_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    fields, limit, cursor = params
+
+    images, next_cursor = image_page(gallery, fields, include_hidden=True, limit=limit, cursor=cursor,
+                                     full_resolution=True)
 
     return jsonify({
         'id': gallery.id,
@@ -162,18 +200,13 @@ def get_gallery(id):
         'hover_animation': gallery.hover_animation,
         'cover_image_id': gallery.cover_image_id,
         'image_count': gallery.image_count,
+        'visible_image_count': gallery.visible_image_count,
+        'total_bytes': gallery.total_bytes,
         'owner_id': gallery.owner_id,
         'created_at': gallery.created_at.isoformat(),
         'updated_at': gallery.updated_at.isoformat(),
-        'images': [{
-            'id': img.id,
-            'filename': img.filename,
-            'original_filename': img.original_filename,
-            'width': img.width,
-            'height': img.height,
-            'is_hidden': img.is_hidden,
-            'order': img.order
-        } for img in images]
+        'images': images,
+        'next_cursor': next_cursor
     }), 200
 
 
@@ -183,6 +216,8 @@ def get_gallery(id):
 def update_gallery(id):
     gallery = Gallery.query.get_or_404(id)
     data = request.get_json()
+    previous_watermark = (gallery.watermark_enabled, settings_dir(gallery))
+    previous_quality = gallery.thumbnail_quality
 
     if 'name' in data:
         gallery.name = data['name']
@@ -212,10 +247,18 @@ def update_gallery(id):
         else:
             gallery.password_hash = None
 
-    cache.clear()
-
     db.session.commit()
 
+    if gallery.thumbnail_quality != previous_quality:
+        requeue_gallery_derivatives(gallery)
+
+    invalidate(gallery_id=gallery.id)
+
+    if (gallery.watermark_enabled, settings_dir(gallery)) != previous_watermark:
+        remove_stale_watermarks(gallery)
+        if gallery.watermark_enabled and data.get('prerender_watermarks', current_app.config['WATERMARK_PRERENDER']):
+            enqueue_watermarks(gallery)
+
     return jsonify({'message': 'Gallery updated successfully'}), 200
 
 
@@ -225,13 +268,24 @@ def update_gallery(id):
 def delete_gallery(id):
     gallery = Gallery.query.get_or_404(id)
 
+    blob_counts = dict(
+        db.session.query(Image.sha256, db.func.count(Image.id))
+        .filter(Image.gallery_id == gallery.id, Image.sha256.isnot(None))
+        .group_by(Image.sha256)
+        .all()
+    )
+    release_references(blob_counts)
+
     gallery_dir = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery.id))
     if os.path.exists(gallery_dir):
         shutil.rmtree(gallery_dir)
+    remove_archives(gallery.id)
 
     db.session.delete(gallery)
     db.session.commit()
 
-    cache.clear()
+    purge_unreferenced(blob_counts)
+
+    invalidate(gallery_id=id)
 
     return jsonify({'message': 'Gallery deleted successfully'}), 200
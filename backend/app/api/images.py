@@ -1,13 +1,34 @@
 import os
-from flask import Blueprint, request, jsonify, send_file, current_app, session
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, session, make_response
 from flask_login import current_user
 from werkzeug.utils import secure_filename
-from PIL import Image as PILImage
-from app import cache
 from app.models import db, Gallery, Image
 from app.utils.decorators import admin_required, audit_log
-from app.utils.helpers import generate_unique_filename, allowed_file
-from app.services.image_processor import generate_thumbnail, apply_watermark
+from app.utils.helpers import allowed_file
+from app.services.image_processor import (
+    IMAGE_FORMATS, is_readable_image, generate_thumbnail, thumbnail_path, derivative_key, derivative_exists,
+    negotiate_format, placeholder_dimensions, render_placeholder
+)
+from app.services.derivatives import thumbnails_dir
+from app.services.watermark import (
+    WATERMARK_FORMAT, apply_watermark, watermark_settings, watermarked_path
+)
+from app.utils.file_delivery import deliver_file
+from app.utils.http_cache import (
+    image_version, image_etag, cache_policy, apply_cache_headers, not_modified_response
+)
+from app.services.image_ingest import store_image, upload_response
+from app.services.bulk_ingest import stage_uploads, store_images
+from app.services.image_batch import (
+    parse_image_ids, gallery_image_ids, reorder_images, set_visibility, delete_images
+)
+from app.services.cache_namespaces import invalidate
+from app.services.gallery_counters import adjust_counters
+from app.services.janitor import record_access
+from app.services.image_order import move_image
+from app.services.responsive import width_ladder, needs_watermark, responsive_variant
+from app.services.blob_store import stream_to_temp, commit_blob
 
 bp = Blueprint('images', __name__)
 
@@ -28,51 +49,35 @@ def upload_image(gallery_id):
     if not allowed_file(file.filename, current_app.config['ALLOWED_EXTENSIONS']):
         return jsonify({'error': 'Invalid file type'}), 400
 
-    original_filename = secure_filename(file.filename)
-    filename = generate_unique_filename(original_filename)
+    temp_path, sha256, _ = stream_to_temp(file.stream)
+    if not is_readable_image(temp_path):
+        os.remove(temp_path)
+        return jsonify({'error': 'Not a readable image'}), 400
+    commit_blob(temp_path, sha256)
 
-    gallery_dir = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery.id))
-    originals_dir = os.path.join(gallery_dir, 'originals')
-    os.makedirs(originals_dir, exist_ok=True)
+    image = store_image(gallery, sha256, secure_filename(file.filename), current_user.id)
 
-    file_path = os.path.join(originals_dir, filename)
-    file.save(file_path)
+    return jsonify(upload_response(image)), 201
 
-    with PILImage.open(file_path) as img:
-        width, height = img.size
 
-    file_size = os.path.getsize(file_path)
-
-    max_order = db.session.query(db.func.max(Image.order)).filter_by(gallery_id=gallery.id).scalar() or 0
-
-    image = Image(
-        gallery_id=gallery.id,
-        filename=filename,
-        original_filename=original_filename,
-        file_size=file_size,
-        width=width,
-        height=height,
-        file_path=file_path,
-        order=max_order + 1,
-        uploaded_by=current_user.id
-    )
+@bp.route('/api/admin/galleries/<int:gallery_id>/images/bulk', methods=['POST'])
+@admin_required
+@audit_log('bulk_upload', 'gallery')
+def bulk_upload_images(gallery_id):
+    gallery = Gallery.query.get_or_404(gallery_id)
 
-    db.session.add(image)
-    db.session.commit()
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
 
-    thumbnails_dir = os.path.join(gallery_dir, 'thumbnails')
-    for size in ['small', 'medium', 'large']:
-        generate_thumbnail(file_path, thumbnails_dir, size, gallery.thumbnail_quality)
+    results = store_images(gallery, stage_uploads(files), current_user.id)
+    created = sum(1 for result in results if result['status'] == 'created')
 
     return jsonify({
-        'id': image.id,
-        'filename': image.filename,
-        'original_filename': image.original_filename,
-        'width': image.width,
-        'height': image.height,
-        'file_size': image.file_size,
-        'message': 'Image uploaded successfully'
-    }), 201
+        'results': results,
+        'created': created,
+        'failed': len(results) - created
+    }), 201 if created else 400
 
 
 @bp.route('/images/thumbnails/<int:gallery_id>/<int:image_id>', methods=['GET'])
@@ -88,13 +93,70 @@ def serve_thumbnail(gallery_id, image_id):
         if not current_user.is_authenticated:
             return jsonify({'error': 'Authentication required'}), 401
 
-    thumbnails_dir = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery_id), 'thumbnails')
-    thumbnail_path = generate_thumbnail(image.file_path, thumbnails_dir, size, gallery.thumbnail_quality)
+    fmt = negotiate_format(request.accept_mimetypes)
+    version = image_version(image, gallery)
+    etag = image_etag(version, size, fmt)
+    policy = cache_policy(gallery, version)
+    not_modified = not_modified_response(etag, policy, vary_accept=True)
+    if not_modified:
+        return not_modified
+
+    output_dir = thumbnails_dir(image)
+    path = thumbnail_path(output_dir, image.file_path, size, gallery.thumbnail_quality, fmt)
+    # The worker records what it rendered, so ready images skip the filesystem check entirely.
+    listed = derivative_key(size, gallery.thumbnail_quality, fmt) in (image.derivative_manifest or ())
+    if not listed and not derivative_exists(path, verify=image.derivative_status != 'ready'):
+        if _derivatives_pending(image):
+            return _placeholder_response(image, size)
+        path = generate_thumbnail(image.file_path, output_dir, size, gallery.thumbnail_quality, fmt)
+
+    response = deliver_file(path, mimetype=IMAGE_FORMATS[fmt]['mimetype'], etag=etag)
+    return apply_cache_headers(response, etag, policy, vary_accept=True)
+
+
+@bp.route('/images/w/<int:gallery_id>/<int:image_id>/<int:width>', methods=['GET'])
+def serve_responsive(gallery_id, image_id, width):
+    image = Image.query.filter_by(id=image_id, gallery_id=gallery_id).first_or_404()
+    gallery = image.gallery
+
+    if not gallery.is_public and not session.get(f'gallery_auth:{gallery.id}'):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required'}), 401
+
+    full_resolution = current_user.is_authenticated
+    if width not in width_ladder(gallery, full_resolution):
+        return jsonify({'error': 'Unsupported width'}), 404
+
+    fmt = negotiate_format(request.accept_mimetypes)
+    version = image_version(image, gallery)
+    etag = image_etag(version, f'{width}w', fmt, 'wm' if needs_watermark(gallery, width, full_resolution) else 'raw')
+    policy = cache_policy(gallery, version)
+    not_modified = not_modified_response(etag, policy, vary_accept=True)
+    if not_modified:
+        return not_modified
+
+    path = responsive_variant(gallery, image, width, fmt, full_resolution)
+
+    response = deliver_file(path, mimetype=IMAGE_FORMATS[fmt]['mimetype'], etag=etag)
+    return apply_cache_headers(response, etag, policy, vary_accept=True)
 
-    if not os.path.exists(thumbnail_path):
-        return jsonify({'error': 'Thumbnail not found'}), 404
 
-    return send_file(thumbnail_path, mimetype='image/jpeg')
+def _derivatives_pending(image):
+    if image.derivative_status not in ('pending', 'processing'):
+        return False
+    # A thumbnail quality change requeues every image in the gallery, not just new uploads.
+    queued_at = max(image.uploaded_at, image.gallery.updated_at)
+    age = (datetime.utcnow() - queued_at).total_seconds()
+    return age < current_app.config['DERIVATIVE_PLACEHOLDER_TIMEOUT']
+
+
+def _placeholder_response(image, size):
+    width, height = placeholder_dimensions(image.width, image.height, size)
+    response = make_response(render_placeholder(width, height))
+    response.mimetype = 'image/jpeg'
+    response.headers['Cache-Control'] = 'no-store'
+    response.vary.add('Accept')
+    return response
 
 
 @bp.route('/images/full/<int:gallery_id>/<int:image_id>', methods=['GET'])
@@ -109,23 +171,35 @@ def serve_full_image(gallery_id, image_id):
     if gallery.thumbnail_only and not current_user.is_authenticated:
         return jsonify({'error': 'Full resolution not available'}), 403
 
-    file_path = image.file_path
-
-    if gallery.watermark_enabled and not current_user.is_authenticated:
-        watermarked_dir = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery_id), 'watermarked')
-        os.makedirs(watermarked_dir, exist_ok=True)
-        watermarked_path = os.path.join(watermarked_dir, image.filename)
-
-        if not os.path.exists(watermarked_path):
-            watermark_text = gallery.watermark_text or gallery.name
-            apply_watermark(file_path, watermarked_path, watermark_text, gallery.watermark_opacity)
-
-        file_path = watermarked_path
-
-    if not os.path.exists(file_path):
+    watermarked = gallery.watermark_enabled and not current_user.is_authenticated
+    version = image_version(image, gallery)
+    etag = image_etag(version, 'full', WATERMARK_FORMAT if watermarked else 'original')
+    policy = cache_policy(gallery, version)
+    not_modified = not_modified_response(etag, policy)
+    if not_modified:
+        return not_modified
+
+    if watermarked:
+        output_path = watermarked_path(gallery, image, WATERMARK_FORMAT)
+
+        if not os.path.exists(output_path):
+            text, opacity = watermark_settings(gallery)
+            apply_watermark(image.file_path, output_path, text, opacity)
+        else:
+            record_access(output_path)
+
+        # The original may be a PNG or WebP, so the saved name has to carry the JPEG extension.
+        extension = IMAGE_FORMATS[WATERMARK_FORMAT]['extension']
+        download_name = f"{os.path.splitext(image.original_filename)[0]}.{extension}"
+        response = deliver_file(output_path, mimetype=IMAGE_FORMATS[WATERMARK_FORMAT]['mimetype'],
+                                as_attachment=False, download_name=download_name, etag=etag)
+        return apply_cache_headers(response, etag, policy)
+
+    if not os.path.exists(image.file_path):
         return jsonify({'error': 'Image not found'}), 404
 
-    return send_file(file_path, mimetype='image/jpeg', as_attachment=False, download_name=image.original_filename)
+    response = deliver_file(image.file_path, as_attachment=False, download_name=image.original_filename, etag=etag)
+    return apply_cache_headers(response, etag, policy)
 
 
 @bp.route('/api/admin/images/<int:id>', methods=['DELETE'])
@@ -133,30 +207,8 @@ def serve_full_image(gallery_id, image_id):
 @audit_log('delete', 'image')
 def delete_image(id):
     image = Image.query.get_or_404(id)
-    gallery = image.gallery
-    gallery_id = image.gallery_id
-
-    if gallery.cover_image_id == image.id:
-        gallery.cover_image_id = None
 
-    if os.path.exists(image.file_path):
-        os.remove(image.file_path)
-
-    thumbnails_dir = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery_id), 'thumbnails')
-    for size in ['small', 'medium', 'large']:
-        name, ext = os.path.splitext(image.filename)
-        thumb_path = os.path.join(thumbnails_dir, f"{name}_{size}{ext}")
-        if os.path.exists(thumb_path):
-            os.remove(thumb_path)
-
-    watermarked_path = os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery_id), 'watermarked', image.filename)
-    if os.path.exists(watermarked_path):
-        os.remove(watermarked_path)
-
-    db.session.delete(image)
-    db.session.commit()
-
-    cache.clear()
+    delete_images(image.gallery, [id])
 
     return jsonify({'message': 'Image deleted successfully'}), 200
 
@@ -172,10 +224,12 @@ def update_image_visibility(id):
     if is_hidden is None:
         return jsonify({'error': 'is_hidden is required'}), 400
 
+    if bool(is_hidden) != image.is_hidden:
+        adjust_counters(image.gallery_id, visible=-1 if is_hidden else 1)
     image.is_hidden = is_hidden
     db.session.commit()
 
-    cache.clear()
+    invalidate(gallery_id=image.gallery_id)
 
     return jsonify({'message': 'Image visibility updated'}), 200
 
@@ -194,4 +248,90 @@ def update_image_order(id):
     image.order = new_order
     db.session.commit()
 
+    invalidate(gallery_id=image.gallery_id)
+
     return jsonify({'message': 'Image order updated successfully'}), 200
+
+
+@bp.route('/api/admin/images/<int:id>/move', methods=['PUT'])
+@admin_required
+@audit_log('move', 'image')
+def move_image_endpoint(id):
+    image = Image.query.get_or_404(id)
+    data = request.get_json(silent=True) or {}
+
+    if 'after_id' not in data:
+        return jsonify({'error': 'after_id is required (null moves the image to the start)'}), 400
+
+    after = None
+    if data['after_id'] is not None:
+        after = Image.query.filter_by(id=data['after_id'], gallery_id=image.gallery_id).first()
+        if not after:
+            return jsonify({'error': 'after_id must be another image in the same gallery'}), 400
+        if after.id == image.id:
+            return jsonify({'error': 'An image cannot be moved after itself'}), 400
+
+    order = move_image(image, after)
+
+    return jsonify({'message': 'Image moved successfully', 'order': order}), 200
+
+
+def _batch_request(gallery_id):
+    gallery = Gallery.query.get_or_404(gallery_id)
+    data = request.get_json(silent=True) or {}
+
+    image_ids = parse_image_ids(data)
+    if image_ids is None:
+        return None, None, (jsonify({'error': 'image_ids must be a non-empty list of unique image ids'}), 400)
+
+    missing = set(image_ids) - gallery_image_ids(gallery, image_ids)
+    if missing:
+        return None, None, (jsonify({'error': 'Images not in gallery', 'image_ids': sorted(missing)}), 404)
+
+    return gallery, image_ids, None
+
+
+@bp.route('/api/admin/galleries/<int:gallery_id>/images/batch/order', methods=['PUT'])
+@admin_required
+@audit_log('batch_reorder', 'gallery')
+def batch_reorder_images(gallery_id):
+    gallery, image_ids, error = _batch_request(gallery_id)
+    if error:
+        return error
+
+    if len(image_ids) != gallery.images.count():
+        return jsonify({'error': 'image_ids must list every image in the gallery'}), 400
+
+    reorder_images(gallery, image_ids)
+
+    return jsonify({'message': 'Image order updated successfully', 'updated': len(image_ids)}), 200
+
+
+@bp.route('/api/admin/galleries/<int:gallery_id>/images/batch/visibility', methods=['PUT'])
+@admin_required
+@audit_log('batch_update_visibility', 'gallery')
+def batch_update_visibility(gallery_id):
+    gallery, image_ids, error = _batch_request(gallery_id)
+    if error:
+        return error
+
+    is_hidden = request.get_json().get('is_hidden')
+    if not isinstance(is_hidden, bool):
+        return jsonify({'error': 'is_hidden is required'}), 400
+
+    updated = set_visibility(gallery, image_ids, is_hidden)
+
+    return jsonify({'message': 'Image visibility updated', 'updated': updated}), 200
+
+
+@bp.route('/api/admin/galleries/<int:gallery_id>/images/batch/delete', methods=['POST'])
+@admin_required
+@audit_log('batch_delete', 'gallery')
+def batch_delete_images(gallery_id):
+    gallery, image_ids, error = _batch_request(gallery_id)
+    if error:
+        return error
+
+    deleted = delete_images(gallery, image_ids)
+
+    return jsonify({'message': 'Images deleted successfully', 'deleted': deleted}), 200
@@ -0,0 +1,158 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import current_user
+from werkzeug.utils import secure_filename
+from app.models import Gallery
+from app.utils.decorators import admin_required, audit_log
+from app.utils.helpers import allowed_file
+from app.services.image_ingest import store_image, upload_response
+from app.services.image_processor import is_readable_image
+from app.services.blob_store import find_blob, commit_blob
+from app.services import upload_sessions
+
+bp = Blueprint('uploads', __name__, url_prefix='/api/admin/galleries/<int:gallery_id>/uploads')
+
+
+def _session_response(session):
+    return {
+        'upload_id': session['upload_id'],
+        'filename': session['filename'],
+        'total_size': session['total_size'],
+        'offset': session['offset'],
+        'chunk_size': current_app.config['CHUNK_SIZE'],
+    }
+
+
+def _load_session(gallery_id, upload_id):
+    session = upload_sessions.get_session(upload_id)
+    if not session or session['gallery_id'] != gallery_id:
+        return None
+    return session
+
+
+@bp.route('', methods=['POST'])
+@admin_required
+def create_upload(gallery_id):
+    gallery = Gallery.query.get_or_404(gallery_id)
+    data = request.get_json(silent=True) or {}
+
+    filename = data.get('filename')
+    total_size = data.get('size')
+    if not filename or total_size is None:
+        return jsonify({'error': 'filename and size are required'}), 400
+
+    if not isinstance(filename, str) or not isinstance(total_size, int) or isinstance(total_size, bool):
+        return jsonify({'error': 'filename must be a string and size an integer'}), 400
+
+    checksum = data.get('sha256') or ''
+    if not isinstance(checksum, str):
+        return jsonify({'error': 'sha256 must be a hex string'}), 400
+
+    if not allowed_file(filename, current_app.config['ALLOWED_EXTENSIONS']):
+        return jsonify({'error': 'Invalid file type'}), 400
+
+    if total_size <= 0 or total_size > current_app.config['MAX_UPLOAD_SIZE']:
+        return jsonify({'error': 'File size exceeds upload limit'}), 413
+
+    session = upload_sessions.create_session(
+        gallery.id, secure_filename(filename), total_size, checksum.lower(), current_user.id
+    )
+
+    response = _session_response(session)
+    response['duplicate'] = bool(checksum) and find_blob(checksum) is not None
+    return jsonify(response), 201
+
+
+@bp.route('/<upload_id>', methods=['GET'])
+@admin_required
+def get_upload(gallery_id, upload_id):
+    session = _load_session(gallery_id, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload session not found'}), 404
+
+    return jsonify(_session_response(session)), 200
+
+
+@bp.route('/<upload_id>', methods=['PUT'])
+@admin_required
+def upload_chunk(gallery_id, upload_id):
+    session = _load_session(gallery_id, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload session not found'}), 404
+
+    # Without a whole-file checksum the per-chunk digest is the only end-to-end check.
+    chunk_checksum = request.headers.get('X-Chunk-SHA256', '').lower()
+    if not chunk_checksum and not session['checksum']:
+        return jsonify({'error': 'X-Chunk-SHA256 is required when no file sha256 was given'}), 400
+
+    length = request.content_length or 0
+    if length > current_app.config['CHUNK_SIZE']:
+        return jsonify({'error': 'Chunk exceeds chunk size'}), 413
+
+    with upload_sessions.chunk_lock(upload_id) as locked:
+        if not locked:
+            return jsonify({'error': 'Chunk upload in progress', 'offset': session['offset']}), 409
+
+        session['offset'] = upload_sessions.current_offset(upload_id)
+        offset = request.args.get('offset', type=int)
+        if offset != session['offset']:
+            return jsonify({'error': 'Offset mismatch', 'offset': session['offset']}), 409
+
+        if offset + length > session['total_size']:
+            return jsonify({'error': 'Chunk exceeds declared file size'}), 416
+
+        written = upload_sessions.write_chunk(session, offset, request.stream, length, chunk_checksum)
+        if written is None:
+            return jsonify({'error': 'Chunk checksum mismatch', 'offset': session['offset']}), 422
+        session['offset'] = written
+
+    return jsonify(_session_response(session)), 200
+
+
+@bp.route('/<upload_id>/complete', methods=['POST'])
+@admin_required
+@audit_log('upload', 'image')
+def complete_upload(gallery_id, upload_id):
+    gallery = Gallery.query.get_or_404(gallery_id)
+    session = _load_session(gallery_id, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload session not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    expected_checksum = data.get('sha256') or session['checksum']
+    if not isinstance(expected_checksum, str):
+        return jsonify({'error': 'sha256 must be a hex string'}), 400
+    expected_checksum = expected_checksum.lower()
+
+    # The client checksum is optional; without one the digest is computed from the assembled file.
+    if not expected_checksum or not find_blob(expected_checksum, lock=True):
+        if session['offset'] != session['total_size']:
+            return jsonify({'error': 'Upload incomplete', 'offset': session['offset']}), 409
+
+        actual_checksum = upload_sessions.session_checksum(session)
+        if expected_checksum and actual_checksum != expected_checksum:
+            upload_sessions.discard_session(upload_id)
+            return jsonify({'error': 'Checksum mismatch'}), 422
+
+        if not is_readable_image(upload_sessions.temp_path(upload_id)):
+            upload_sessions.discard_session(upload_id)
+            return jsonify({'error': 'Not a readable image'}), 400
+
+        expected_checksum = actual_checksum
+        commit_blob(upload_sessions.temp_path(upload_id), expected_checksum)
+
+    upload_sessions.discard_session(upload_id)
+
+    image = store_image(gallery, expected_checksum, session['filename'], current_user.id)
+
+    return jsonify(upload_response(image)), 201
+
+
+@bp.route('/<upload_id>', methods=['DELETE'])
+@admin_required
+def cancel_upload(gallery_id, upload_id):
+    if not _load_session(gallery_id, upload_id):
+        return jsonify({'error': 'Upload session not found'}), 404
+
+    upload_sessions.discard_session(upload_id)
+
+    return jsonify({'message': 'Upload cancelled'}), 200
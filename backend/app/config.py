@@ -1,4 +1,5 @@
 import os
+import multiprocessing
 from datetime import timedelta
 
 
@@ -24,11 +25,43 @@ class Config:
 
     MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 524288000))
     CHUNK_SIZE = int(os.environ.get('CHUNK_SIZE', 5242880))
+    BULK_UPLOAD_MAX_FILES = int(os.environ.get('BULK_UPLOAD_MAX_FILES', 2000))
+    UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', 86400))
     ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
 
+    DERIVATIVE_WORKER_PROCESSES = int(os.environ.get('DERIVATIVE_WORKER_PROCESSES', multiprocessing.cpu_count()))
+    DERIVATIVE_PLACEHOLDER_TIMEOUT = int(os.environ.get('DERIVATIVE_PLACEHOLDER_TIMEOUT', 300))
+    WATERMARK_PRERENDER = os.environ.get('WATERMARK_PRERENDER', 'false').lower() == 'true'
+
+    RESPONSIVE_WIDTHS = tuple(int(width) for width in
+                              os.environ.get('RESPONSIVE_WIDTHS', '320,640,960,1280,1920,2560').split(','))
+
+    ZIP_WORKER_CONCURRENCY = int(os.environ.get('ZIP_WORKER_CONCURRENCY', 2))
+    ZIP_QUEUE_LIMIT = int(os.environ.get('ZIP_QUEUE_LIMIT', 20))
+    ZIP_ABANDON_TIMEOUT = int(os.environ.get('ZIP_ABANDON_TIMEOUT', 600))
+
+    ZIP_DISK_BUDGET = int(os.environ.get('ZIP_DISK_BUDGET', 21474836480))
+    WATERMARK_DISK_BUDGET = int(os.environ.get('WATERMARK_DISK_BUDGET', 5368709120))
+    RESPONSIVE_DISK_BUDGET = int(os.environ.get('RESPONSIVE_DISK_BUDGET', 10737418240))
+    ARTIFACT_ORPHAN_AGE = int(os.environ.get('ARTIFACT_ORPHAN_AGE', 86400))
+
     GALLERY_DATA_PATH = '/app/data/galleries'
     TEMP_UPLOAD_PATH = '/app/data/temp'
     ZIP_OUTPUT_PATH = '/app/data/zips'
+    BLOB_STORE_PATH = '/app/data/blobs'
+    DERIVATIVE_PATH = '/app/data/derivatives'
+    AUDIT_ARCHIVE_PATH = '/app/data/audit-archive'
+    RESPONSIVE_CACHE_PATH = '/app/data/responsive'
+
+    FILE_DELIVERY = os.environ.get('FILE_DELIVERY', 'flask')
+    FILE_DELIVERY_ROOT = '/app/data'
+    FILE_DELIVERY_INTERNAL_PREFIX = '/protected-data'
+
+    AUDIT_LOG_SYNC = os.environ.get('AUDIT_LOG_SYNC', 'false').lower() == 'true'
+    AUDIT_LOG_FLUSH_SIZE = int(os.environ.get('AUDIT_LOG_FLUSH_SIZE', 200))
+    AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', 2))
+    AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', 90))
+    AUDIT_ARCHIVE_BATCH_SIZE = int(os.environ.get('AUDIT_ARCHIVE_BATCH_SIZE', 5000))
 
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
 
@@ -59,6 +92,7 @@ class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    AUDIT_LOG_SYNC = True
 
 
 config = {
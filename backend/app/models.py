@@ -38,6 +38,9 @@ class Gallery(db.Model):
     thumbnail_quality = db.Column(db.Integer, default=85, nullable=False)
     hover_animation = db.Column(db.String(20), default='crossfade', nullable=False)
     cover_image_id = db.Column(db.Integer, nullable=True)
+    image_count = db.Column(db.Integer, default=0, nullable=False)
+    visible_image_count = db.Column(db.Integer, default=0, nullable=False)
+    total_bytes = db.Column(db.BigInteger, default=0, nullable=False)
     owner_id = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -47,9 +50,19 @@ class Gallery(db.Model):
     def __repr__(self):
         return f'<Gallery {self.name}>'
 
-    @property
-    def image_count(self):
-        return self.images.count()
+
+class Blob(db.Model):
+    __tablename__ = 'blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=False)
+    crc32 = db.Column(db.BigInteger, nullable=True)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<Blob {self.sha256}>'
 
 
 class Image(db.Model):
@@ -64,8 +77,13 @@ class Image(db.Model):
     width = db.Column(db.Integer, nullable=False)
     height = db.Column(db.Integer, nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
+    sha256 = db.Column(db.String(64), db.ForeignKey('blobs.sha256'), nullable=True, index=True)
     is_hidden = db.Column(db.Boolean, default=False, nullable=False)
     order = db.Column(db.Integer, default=0, nullable=False)
+    derivative_status = db.Column(db.String(20), default='pending', nullable=False)
+    derivative_manifest = db.Column(db.JSON, nullable=True)
+    preview = db.Column(db.Text, nullable=True)
+    dominant_color = db.Column(db.String(7), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=False)
 
@@ -76,8 +94,10 @@ class Image(db.Model):
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
     __table_args__ = (
-        db.Index('idx_admin_created', 'admin_id', 'created_at'),
-        db.Index('idx_created_at', 'created_at'),
+        db.Index('idx_admin_created', 'admin_id', 'created_at', 'id'),
+        db.Index('idx_action_created', 'action', 'created_at', 'id'),
+        db.Index('idx_resource_created', 'resource_type', 'resource_id', 'created_at', 'id'),
+        db.Index('idx_created_at', 'created_at', 'id'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -87,7 +107,7 @@ class AuditLog(db.Model):
     resource_id = db.Column(db.Integer, nullable=True)
     details = db.Column(db.JSON, nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self):
         return f'<AuditLog {self.action} by Admin#{self.admin_id}>'
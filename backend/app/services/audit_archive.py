@@ -0,0 +1,101 @@
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from flask import current_app
+from app.models import db, AuditLog
+from app.services.audit_search import serialize_log, record_cursor
+
+
+ARCHIVE_PATTERN = re.compile(r'^audit-(\d{4}-\d{2})\.jsonl\.gz$')
+
+
+def archive_path(month):
+    return os.path.join(current_app.config['AUDIT_ARCHIVE_PATH'], f'audit-{month}.jsonl.gz')
+
+
+def _append_to_archives(logs):
+    by_month = {}
+    for log in logs:
+        by_month.setdefault(log.created_at.strftime('%Y-%m'), []).append(serialize_log(log))
+
+    for month, records in by_month.items():
+        path = archive_path(month)
+        # Each batch is appended as its own gzip member; readers see one continuous stream.
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            f.writelines(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def archive_logs(older_than_days, batch_size=None):
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    batch_size = batch_size or current_app.config['AUDIT_ARCHIVE_BATCH_SIZE']
+    archived = 0
+
+    while True:
+        logs = (AuditLog.query.filter(AuditLog.created_at < cutoff)
+                .order_by(AuditLog.created_at, AuditLog.id)
+                .limit(batch_size).all())
+        if not logs:
+            return archived
+
+        _append_to_archives(logs)
+
+        AuditLog.query.filter(AuditLog.id.in_([log.id for log in logs])).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(logs)
+
+
+def _archived_months():
+    root = current_app.config['AUDIT_ARCHIVE_PATH']
+    if not os.path.isdir(root):
+        return []
+    months = [match.group(1) for match in map(ARCHIVE_PATTERN.match, os.listdir(root)) if match]
+    return sorted(months, reverse=True)
+
+
+def _read_month(month):
+    records = {}
+    with gzip.open(archive_path(month), 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            # A crash between writing a batch and deleting its rows archives it twice.
+            records[record['id']] = record
+    return sorted(records.values(), key=lambda record: (record['created_at'], record['id']), reverse=True)
+
+
+def _matches(record, filters, since, until, cursor):
+    if any(record[name] != value for name, value in filters.items()):
+        return False
+
+    created_at = datetime.fromisoformat(record['created_at'])
+    if since and created_at < since:
+        return False
+    if until and created_at >= until:
+        return False
+    return not cursor or (created_at, record['id']) < cursor
+
+
+def continue_into_archive(records, limit, filters, since=None, until=None, cursor=None):
+    if records:
+        cursor = datetime.fromisoformat(records[-1]['created_at']), records[-1]['id']
+
+    for month in _archived_months():
+        if len(records) > limit:
+            break
+        if (cursor and month > cursor[0].strftime('%Y-%m')) or (until and month > until.strftime('%Y-%m')):
+            continue
+        if since and month < since.strftime('%Y-%m'):
+            break
+        records = records + [record for record in _read_month(month)
+                             if _matches(record, filters, since, until, cursor)]
+
+    if len(records) > limit:
+        return records[:limit], record_cursor(records[limit - 1])
+    return records, None
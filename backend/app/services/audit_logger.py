@@ -1,15 +1,82 @@
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+from flask import current_app
 from app.models import db, AuditLog
 
 
+_buffer = []
+_lock = threading.Lock()
+_app = None
+_flusher_pid = None
+
+
 def log_action(admin_id, action, resource_type, resource_id=None, details=None, ip_address=None):
-    audit_log = AuditLog(
-        admin_id=admin_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        details=details,
-        ip_address=ip_address
-    )
-    db.session.add(audit_log)
-    db.session.commit()
-    return audit_log
+    record = {
+        'admin_id': admin_id,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'details': details,
+        'ip_address': ip_address,
+        'created_at': datetime.utcnow(),
+    }
+
+    if current_app.config['AUDIT_LOG_SYNC']:
+        _write([record])
+        return record
+
+    _start_flusher()
+    with _lock:
+        _buffer.append(record)
+        full = len(_buffer) >= current_app.config['AUDIT_LOG_FLUSH_SIZE']
+    if full:
+        flush_pending()
+    return record
+
+
+def _write(records):
+    with db.engine.begin() as connection:
+        connection.execute(AuditLog.__table__.insert(), records)
+
+
+def flush_pending():
+    global _buffer
+    with _lock:
+        records, _buffer = _buffer, []
+    if not records or _app is None:
+        return 0
+
+    with _app.app_context():
+        try:
+            _write(records)
+        except Exception:
+            with _lock:
+                _buffer = records + _buffer
+            raise
+    return len(records)
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_pending()
+        except Exception:
+            _app.logger.exception('Failed to flush audit log buffer; will retry')
+
+
+def _start_flusher():
+    global _app, _flusher_pid
+    # gunicorn preloads the app before forking, so each worker starts its own flusher.
+    if _flusher_pid == os.getpid():
+        return
+
+    _app = current_app._get_current_object()
+    _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, args=(_app.config['AUDIT_LOG_FLUSH_INTERVAL'],), daemon=True).start()
+
+
+atexit.register(flush_pending)
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from app.models import db, AuditLog
+from app.utils.helpers import encode_cursor, decode_cursor
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+COUNT_CAP = 10000
+FILTER_COLUMNS = {
+    'admin_id': AuditLog.admin_id,
+    'action': AuditLog.action,
+    'resource_type': AuditLog.resource_type,
+    'resource_id': AuditLog.resource_id,
+}
+
+
+def serialize_log(log):
+    return {
+        'id': log.id,
+        'admin_id': log.admin_id,
+        'action': log.action,
+        'resource_type': log.resource_type,
+        'resource_id': log.resource_id,
+        'details': log.details,
+        'ip_address': log.ip_address,
+        'created_at': log.created_at.isoformat()
+    }
+
+
+def parse_timestamp(raw):
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        return None
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_cursor(raw):
+    values = decode_cursor(raw, 2)
+    if values is None or not isinstance(values[1], int):
+        return None
+    created_at = parse_timestamp(values[0]) if isinstance(values[0], str) else None
+    if created_at is None:
+        return None
+    return created_at, values[1]
+
+
+def filtered_query(filters, since=None, until=None):
+    query = AuditLog.query
+    for name, value in filters.items():
+        query = query.filter(FILTER_COLUMNS[name] == value)
+    if since:
+        query = query.filter(AuditLog.created_at >= since)
+    if until:
+        query = query.filter(AuditLog.created_at < until)
+    return query
+
+
+def log_page(query, limit, cursor=None):
+    if cursor:
+        created_at, log_id = cursor
+        query = query.filter(
+            AuditLog.created_at <= created_at,
+            db.or_(AuditLog.created_at < created_at, AuditLog.id < log_id)
+        )
+
+    logs = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1).all()
+    records = [serialize_log(log) for log in logs[:limit]]
+    return records, record_cursor(records[-1]) if len(logs) > limit else None
+
+
+def record_cursor(record):
+    return encode_cursor([record['created_at'], record['id']])
+
+
+def _table_rows_estimate():
+    if db.engine.dialect.name != 'mysql':
+        return None
+    return db.session.execute(text(
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = :table'
+    ), {'table': AuditLog.__tablename__}).scalar()
+
+
+def approximate_total(query, filtered):
+    if not filtered:
+        estimate = _table_rows_estimate()
+        if estimate is not None:
+            return int(estimate), True
+
+    capped = query.with_entities(AuditLog.id).limit(COUNT_CAP).subquery()
+    total = db.session.query(db.func.count()).select_from(capped).scalar()
+    return total, total >= COUNT_CAP
@@ -0,0 +1,109 @@
+import os
+import zlib
+import hashlib
+import secrets
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.models import db, Blob
+from app.services.image_processor import derivative_files, forget_derivatives
+
+
+STREAM_READ_SIZE = 65536
+
+
+def blob_path(sha256):
+    return os.path.join(current_app.config['BLOB_STORE_PATH'], sha256[:2], sha256)
+
+
+def blob_derivatives_dir(sha256):
+    return os.path.join(current_app.config['DERIVATIVE_PATH'], sha256[:2])
+
+
+def find_blob(sha256, lock=False):
+    query = Blob.query.filter_by(sha256=sha256)
+    blob = (query.with_for_update() if lock else query).first()
+    if blob and os.path.exists(blob.file_path):
+        return blob
+    return None
+
+
+def stream_to_temp(stream):
+    temp_path = os.path.join(current_app.config['TEMP_UPLOAD_PATH'], f'{secrets.token_urlsafe(16)}.part')
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(temp_path, 'wb') as f:
+        while chunk := stream.read(STREAM_READ_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+
+    return temp_path, digest.hexdigest(), size
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(STREAM_READ_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def commit_blob(temp_path, sha256):
+    # Holding the row until the caller's reference commits keeps a concurrent purge from
+    # deleting a file this upload is about to reuse.
+    find_blob(sha256, lock=True)
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        os.remove(temp_path)
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+    return path
+
+
+def add_reference(sha256):
+    updated = Blob.query.filter_by(sha256=sha256).update(
+        {Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+
+    path = blob_path(sha256)
+    try:
+        with db.session.begin_nested():
+            db.session.add(Blob(sha256=sha256, file_path=path, file_size=os.path.getsize(path),
+                                crc32=file_crc32(path), ref_count=1))
+    except IntegrityError:
+        Blob.query.filter_by(sha256=sha256).update(
+            {Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False
+        )
+
+
+def release_references(counts):
+    for sha256, count in counts.items():
+        if sha256:
+            Blob.query.filter_by(sha256=sha256).update(
+                {Blob.ref_count: Blob.ref_count - count}, synchronize_session=False
+            )
+
+
+def purge_unreferenced(sha256s):
+    purged = 0
+    for sha256 in filter(None, set(sha256s)):
+        # Re-check under the row lock; an upload may have referenced the blob since it was released.
+        blob = Blob.query.filter_by(sha256=sha256).with_for_update().first()
+        if not blob or blob.ref_count > 0:
+            db.session.commit()
+            continue
+
+        paths = [blob_path(sha256)] + derivative_files(blob_derivatives_dir(sha256), sha256)
+        forget_derivatives(paths)
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        db.session.delete(blob)
+        db.session.commit()
+        purged += 1
+    return purged
@@ -0,0 +1,105 @@
+import os
+import tarfile
+import zipfile
+from werkzeug.utils import secure_filename
+from flask import current_app
+from app.models import db
+from app.utils.helpers import allowed_file
+from app.services.image_processor import is_readable_image
+from app.services.blob_store import stream_to_temp, commit_blob, add_reference
+from app.services.derivatives import DERIVATIVE_QUEUE
+from app.services.image_ingest import new_image
+from app.services.image_order import next_order
+from app.services.job_queue import enqueue_jobs
+from app.services.cache_namespaces import invalidate
+from app.services.gallery_counters import adjust_counters
+
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+def is_archive(filename):
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _is_image_member(name):
+    basename = os.path.basename(name)
+    # Skip macOS resource forks and other hidden entries that archivers add.
+    return (basename and not basename.startswith('.') and '__MACOSX' not in name
+            and allowed_file(basename, current_app.config['ALLOWED_EXTENSIONS']))
+
+
+def archive_members(stream, filename):
+    # Yields (name, file object) for every image in a ZIP or tar archive without extracting to disk.
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_image_member(info.filename):
+                    with archive.open(info) as member:
+                        yield info.filename, member
+    else:
+        with tarfile.open(fileobj=stream, mode='r|*') as archive:
+            for info in archive:
+                if info.isfile() and _is_image_member(info.name):
+                    yield info.name, archive.extractfile(info)
+
+
+def stage_file(stream, filename):
+    filename = secure_filename(os.path.basename(filename))
+    if not filename or not allowed_file(filename, current_app.config['ALLOWED_EXTENSIONS']):
+        return {'filename': filename, 'status': 'error', 'error': 'Invalid file type'}
+
+    temp_path, sha256, _ = stream_to_temp(stream)
+    if not is_readable_image(temp_path):
+        os.remove(temp_path)
+        return {'filename': filename, 'status': 'error', 'error': 'Not a readable image'}
+
+    commit_blob(temp_path, sha256)
+    return {'filename': filename, 'status': 'staged', 'sha256': sha256}
+
+
+def stage_uploads(files):
+    results = []
+    limit = current_app.config['BULK_UPLOAD_MAX_FILES']
+    for file in files:
+        if is_archive(file.filename):
+            try:
+                for name, member in archive_members(file.stream, file.filename):
+                    if len(results) >= limit:
+                        break
+                    results.append(stage_file(member, name))
+            except (zipfile.BadZipFile, tarfile.TarError):
+                results.append({'filename': file.filename, 'status': 'error', 'error': 'Unreadable archive'})
+        elif len(results) < limit:
+            results.append(stage_file(file.stream, file.filename))
+
+        if len(results) >= limit:
+            break
+    return results
+
+
+def store_images(gallery, results, uploaded_by):
+    staged = [result for result in results if result['status'] == 'staged']
+    if not staged:
+        return results
+
+    images = []
+    for result, order in zip(staged, next_order(gallery.id, len(staged))):
+        image = new_image(gallery, result['sha256'], result['filename'], uploaded_by, order)
+        add_reference(result['sha256'])
+        images.append(image)
+
+    db.session.add_all(images)
+    adjust_counters(gallery.id, images=len(images), visible=len(images),
+                    size=sum(image.file_size for image in images))
+    db.session.commit()
+
+    invalidate(gallery_id=gallery.id)
+    enqueue_jobs(current_app.config['REDIS_URL'], DERIVATIVE_QUEUE,
+                 [{'image_id': image.id} for image in images if image.derivative_status == 'pending'])
+
+    for result, image in zip(staged, images):
+        del result['sha256']
+        result.update(status='created', id=image.id,
+                      processing=image.derivative_status != 'ready')
+    return results
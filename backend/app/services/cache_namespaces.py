@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import Counter
+from app import cache
+
+
+STATS_EVENTS = ('hits', 'misses', 'invalidations')
+STATS_FLUSH_INTERVAL = 5
+STATS_FLUSH_SIZE = 100
+
+_pending_stats = Counter()
+_last_flush = time.monotonic()
+_stats_lock = threading.Lock()
+
+
+def _generation_key(scope, scope_id):
+    return f'cache_gen:{scope}:{scope_id}'
+
+
+def _stats_key(event):
+    return f'cache_stats:{event}'
+
+
+def _scopes(gallery_id, image_id):
+    return [(scope, scope_id) for scope, scope_id in (('gallery', gallery_id), ('image', image_id))
+            if scope_id is not None]
+
+
+def _generations(scopes):
+    keys = [_generation_key(scope, scope_id) for scope, scope_id in scopes]
+    generations = list(cache.get_many(*keys)) if keys else []
+
+    for index, generation in enumerate(generations):
+        if generation is None:
+            # Seed from the clock so an evicted counter never restarts at a
+            # generation that older entries were written under.
+            cache.add(keys[index], time.time_ns() // 1000000, timeout=0)
+            generations[index] = cache.get(keys[index])
+    return generations
+
+
+def namespaced_key(key, gallery_id=None, image_id=None):
+    scopes = _scopes(gallery_id, image_id)
+    generations = _generations(scopes)
+    suffix = ':'.join(f'{scope}{scope_id}.{generation}'
+                      for (scope, scope_id), generation in zip(scopes, generations))
+    return f'{key}:{suffix}' if suffix else key
+
+
+def _record(event, count=1):
+    with _stats_lock:
+        _pending_stats[event] += count
+        due = (time.monotonic() - _last_flush > STATS_FLUSH_INTERVAL
+               or sum(_pending_stats.values()) >= STATS_FLUSH_SIZE)
+
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    global _pending_stats, _last_flush
+    # Swap the counter out under the lock so concurrent records land in the next flush.
+    with _stats_lock:
+        pending, _pending_stats = _pending_stats, Counter()
+        _last_flush = time.monotonic()
+
+    for event, count in pending.items():
+        if count:
+            cache.cache.inc(_stats_key(event), count)
+
+
+def cached_get(key):
+    value = cache.get(key)
+    _record('hits' if value is not None else 'misses')
+    return value
+
+
+def invalidate(gallery_id=None, image_id=None):
+    for scope, scope_id in _scopes(gallery_id, image_id):
+        cache.cache.inc(_generation_key(scope, scope_id))
+    _record('invalidations')
+
+
+def cache_stats():
+    flush_stats()
+    stats = {event: int(cache.get(_stats_key(event)) or 0) for event in STATS_EVENTS}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
@@ -0,0 +1,118 @@
+import os
+import multiprocessing
+from redis import Redis
+from flask import current_app
+from app.models import db, Image
+from app.services.image_processor import render_thumbnails, image_preview, derivative_manifest, supported_formats
+from app.services.job_queue import enqueue_job, enqueue_jobs, dequeue_jobs
+from app.services.watermark import render_watermarks, watermark_settings, watermarked_path, WATERMARK_FORMAT
+from app.services.blob_store import blob_derivatives_dir
+from app.services.cache_namespaces import invalidate
+
+
+DERIVATIVE_QUEUE = 'derivatives'
+
+
+def thumbnails_dir(image):
+    if image.sha256:
+        return blob_derivatives_dir(image.sha256)
+    return os.path.join(current_app.config['GALLERY_DATA_PATH'], str(image.gallery_id), 'thumbnails')
+
+
+def enqueue_derivatives(image):
+    enqueue_job(current_app.config['REDIS_URL'], DERIVATIVE_QUEUE, {'image_id': image.id})
+
+
+def requeue_gallery_derivatives(gallery):
+    # Thumbnail paths include the quality, so a quality change needs every size rendered again.
+    image_ids = [image_id for image_id, in db.session.query(Image.id).filter_by(gallery_id=gallery.id)]
+    Image.query.filter_by(gallery_id=gallery.id).update(
+        {Image.derivative_status: 'pending'}, synchronize_session=False
+    )
+    db.session.commit()
+    enqueue_jobs(current_app.config['REDIS_URL'], DERIVATIVE_QUEUE,
+                 [{'image_id': image_id} for image_id in image_ids])
+    return len(image_ids)
+
+
+def enqueue_watermarks(gallery):
+    image_ids = [image_id for image_id, in db.session.query(Image.id).filter_by(gallery_id=gallery.id)]
+    enqueue_jobs(current_app.config['REDIS_URL'], DERIVATIVE_QUEUE,
+                 [{'image_id': image_id, 'kind': 'watermark'} for image_id in image_ids])
+    return len(image_ids)
+
+
+def render_derivatives(job):
+    preview = None
+    try:
+        if job['kind'] == 'watermark':
+            render_watermarks(job['file_path'], job['outputs'], job['text'], job['opacity'])
+        else:
+            paths = render_thumbnails(job['file_path'], job['output_dir'], job['quality'], job['formats'])
+            # The small thumbnail is a far cheaper source than the original.
+            preview = image_preview(next(iter(paths['small'].values())))
+    except Exception as e:
+        return job['image_id'], str(e), None
+    return job['image_id'], None, preview
+
+
+def _set_status(image_ids, status):
+    if image_ids:
+        Image.query.filter(Image.id.in_(image_ids)).update(
+            {Image.derivative_status: status}, synchronize_session=False
+        )
+
+
+def _render_job(image, kind):
+    job = {'image_id': image.id, 'kind': kind, 'file_path': image.file_path}
+    if kind == 'watermark':
+        text, opacity = watermark_settings(image.gallery)
+        job.update(text=text, opacity=opacity, outputs={
+            WATERMARK_FORMAT: watermarked_path(image.gallery, image, WATERMARK_FORMAT)
+        })
+    else:
+        job.update(output_dir=thumbnails_dir(image), quality=image.gallery.thumbnail_quality,
+                   formats=supported_formats())
+    return job
+
+
+def process_derivative_jobs(pool, jobs):
+    images = {image.id: image for image in Image.query.filter(Image.id.in_([job['image_id'] for job in jobs]))}
+    render_jobs = [_render_job(images[job['image_id']], job.get('kind', 'thumbnails'))
+                   for job in jobs if job['image_id'] in images]
+    thumbnail_ids = [job['image_id'] for job in render_jobs if job['kind'] == 'thumbnails']
+
+    _set_status(thumbnail_ids, 'processing')
+    db.session.commit()
+
+    results = pool.map(render_derivatives, render_jobs)
+
+    for job, (image_id, error, preview) in zip(render_jobs, results):
+        if error:
+            current_app.logger.error('Derivative generation failed for image %s: %s', image_id, error)
+        elif job['kind'] == 'thumbnails':
+            images[image_id].derivative_manifest = derivative_manifest(job['quality'], job['formats'])
+            images[image_id].preview, images[image_id].dominant_color = preview
+
+    thumbnail_results = [result for job, result in zip(render_jobs, results) if job['kind'] == 'thumbnails']
+    _set_status([image_id for image_id, error, _ in thumbnail_results if not error], 'ready')
+    _set_status([image_id for image_id, error, _ in thumbnail_results if error], 'error')
+    db.session.commit()
+
+    # Cached gallery JSON predates the previews that were just stored.
+    for gallery_id in {images[image_id].gallery_id for image_id, _, preview in results if preview}:
+        invalidate(gallery_id=gallery_id)
+
+    return len(results)
+
+
+def run_derivative_worker(processes=None):
+    processes = processes or current_app.config['DERIVATIVE_WORKER_PROCESSES']
+    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
+
+    with multiprocessing.Pool(processes) as pool:
+        while True:
+            jobs = dequeue_jobs(redis_client, DERIVATIVE_QUEUE, processes)
+            if jobs:
+                process_derivative_jobs(pool, jobs)
+            db.session.remove()
@@ -0,0 +1,37 @@
+from sqlalchemy import case
+from app.models import db, Gallery, Image
+
+
+def adjust_counters(gallery_id, images=0, visible=0, size=0):
+    Gallery.query.filter_by(id=gallery_id).update({
+        Gallery.image_count: Gallery.image_count + images,
+        Gallery.visible_image_count: Gallery.visible_image_count + visible,
+        Gallery.total_bytes: Gallery.total_bytes + size,
+        Gallery.updated_at: Gallery.updated_at,
+    }, synchronize_session=False)
+
+
+def recompute_counters():
+    totals = db.session.query(
+        Image.gallery_id,
+        db.func.count(Image.id),
+        db.func.sum(case((Image.is_hidden.is_(False), 1), else_=0)),
+        db.func.sum(Image.file_size),
+    ).group_by(Image.gallery_id).all()
+    totals = {gallery_id: (count, visible, size) for gallery_id, count, visible, size in totals}
+
+    repaired = 0
+    for gallery in Gallery.query.all():
+        count, visible, size = totals.get(gallery.id, (0, 0, 0))
+        current = (gallery.image_count, gallery.visible_image_count, gallery.total_bytes)
+        if current != (count, int(visible or 0), int(size or 0)):
+            Gallery.query.filter_by(id=gallery.id).update({
+                Gallery.image_count: count,
+                Gallery.visible_image_count: int(visible or 0),
+                Gallery.total_bytes: int(size or 0),
+                Gallery.updated_at: Gallery.updated_at,
+            }, synchronize_session=False)
+            repaired += 1
+
+    db.session.commit()
+    return repaired
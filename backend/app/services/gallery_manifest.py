@@ -0,0 +1,81 @@
+from app.models import db, Image
+from app.utils.helpers import encode_cursor, decode_cursor
+from app.utils.http_cache import image_version
+from app.services.responsive import width_ladder, srcset
+
+
+PUBLIC_FIELDS = ('id', 'filename', 'original_filename', 'width', 'height', 'order', 'version', 'srcset',
+                 'preview', 'dominant_color')
+ADMIN_FIELDS = PUBLIC_FIELDS + ('is_hidden', 'derivative_status')
+VERSION_COLUMNS = ('id', 'file_size', 'uploaded_at')
+SRCSET_COLUMNS = ('width',) + VERSION_COLUMNS
+CURSOR_COLUMNS = ('order', 'id')
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(raw, allowed):
+    if not raw:
+        return allowed
+    fields = tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    if not fields or any(field not in allowed for field in fields):
+        return None
+    return fields
+
+
+def parse_page_size(raw):
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(raw, MAX_PAGE_SIZE))
+
+
+def parse_cursor(raw):
+    values = decode_cursor(raw, len(CURSOR_COLUMNS))
+    if values is None or not all(isinstance(value, int) for value in values):
+        return None
+    return values
+
+
+def _columns(fields):
+    names = [field for field in fields if field not in ('version', 'srcset')]
+    if 'version' in fields:
+        names += VERSION_COLUMNS
+    if 'srcset' in fields:
+        names += SRCSET_COLUMNS
+    names += CURSOR_COLUMNS
+    return [getattr(Image, name) for name in dict.fromkeys(names)]
+
+
+def _field_value(row, field, gallery, ladder):
+    if field == 'version':
+        return image_version(row, gallery)
+    if field == 'srcset':
+        return srcset(gallery.id, row.id, row.width, image_version(row, gallery), ladder)
+    return getattr(row, field)
+
+
+def _serialize(row, fields, gallery, ladder):
+    return {field: _field_value(row, field, gallery, ladder) for field in fields}
+
+
+def image_page(gallery, fields, include_hidden=False, limit=None, cursor=None, full_resolution=False):
+    query = db.session.query(*_columns(fields)).filter(Image.gallery_id == gallery.id)
+    if not include_hidden:
+        query = query.filter(Image.is_hidden.is_(False))
+
+    if cursor:
+        order, image_id = cursor
+        query = query.filter(Image.order >= order, db.or_(Image.order > order, Image.id > image_id))
+
+    query = query.order_by(Image.order, Image.id)
+    if limit:
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].order, rows[-1].id])
+
+    ladder = width_ladder(gallery, full_resolution)
+    return [_serialize(row, fields, gallery, ladder) for row in rows], next_cursor
@@ -0,0 +1,72 @@
+import os
+from collections import Counter
+from app.models import db, Image
+from app.services.derivatives import thumbnails_dir
+from app.services.image_processor import derivative_files
+from app.services.watermark import watermark_files
+from app.services.blob_store import release_references, purge_unreferenced
+from app.services.gallery_counters import adjust_counters
+from app.services.cache_namespaces import invalidate
+from app.services.image_order import write_positions
+
+
+MAX_BATCH_SIZE = 10000
+
+
+def parse_image_ids(data):
+    image_ids = (data or {}).get('image_ids')
+    if (not isinstance(image_ids, list) or not image_ids or len(image_ids) > MAX_BATCH_SIZE
+            or not all(isinstance(image_id, int) and not isinstance(image_id, bool) for image_id in image_ids)
+            or len(set(image_ids)) != len(image_ids)):
+        return None
+    return image_ids
+
+
+def gallery_image_ids(gallery, image_ids):
+    return {image_id for image_id, in db.session.query(Image.id)
+            .filter(Image.gallery_id == gallery.id, Image.id.in_(image_ids))}
+
+
+def reorder_images(gallery, image_ids):
+    # One UPDATE ... CASE rewrites every position instead of one request per moved image.
+    write_positions(gallery.id, image_ids)
+    db.session.commit()
+    invalidate(gallery_id=gallery.id)
+
+
+def set_visibility(gallery, image_ids, is_hidden):
+    changed = Image.query.filter(
+        Image.gallery_id == gallery.id, Image.id.in_(image_ids), Image.is_hidden.isnot(is_hidden)
+    ).update({Image.is_hidden: is_hidden}, synchronize_session=False)
+
+    adjust_counters(gallery.id, visible=-changed if is_hidden else changed)
+    db.session.commit()
+    invalidate(gallery_id=gallery.id)
+    return changed
+
+
+def delete_images(gallery, image_ids):
+    images = Image.query.filter(Image.gallery_id == gallery.id, Image.id.in_(image_ids)).all()
+    if gallery.cover_image_id in image_ids:
+        gallery.cover_image_id = None
+
+    blob_counts = Counter(image.sha256 for image in images if image.sha256)
+    release_references(blob_counts)
+
+    for image in images:
+        if not image.sha256 and os.path.exists(image.file_path):
+            os.remove(image.file_path)
+            for derivative_path in derivative_files(thumbnails_dir(image), image.file_path):
+                os.remove(derivative_path)
+        for derivative_path in watermark_files(gallery.id, image):
+            os.remove(derivative_path)
+
+    adjust_counters(gallery.id, images=-len(images),
+                    visible=-sum(1 for image in images if not image.is_hidden),
+                    size=-sum(image.file_size for image in images))
+    Image.query.filter(Image.id.in_([image.id for image in images])).delete(synchronize_session=False)
+    db.session.commit()
+
+    purge_unreferenced(blob_counts)
+    invalidate(gallery_id=gallery.id)
+    return len(images)
@@ -0,0 +1,68 @@
+import os
+from PIL import Image as PILImage
+from app.models import db, Image
+from app.utils.helpers import generate_unique_filename
+from app.services.blob_store import blob_path, add_reference
+from app.services.derivatives import enqueue_derivatives, thumbnails_dir
+from app.services.image_processor import thumbnail_path
+from app.services.cache_namespaces import invalidate
+from app.services.gallery_counters import adjust_counters
+from app.services.image_order import next_order
+
+
+def new_image(gallery, sha256, original_filename, uploaded_by, order):
+    file_path = blob_path(sha256)
+    with PILImage.open(file_path) as img:
+        width, height = img.size
+
+    image = Image(
+        gallery_id=gallery.id,
+        filename=generate_unique_filename(original_filename),
+        original_filename=original_filename,
+        file_size=os.path.getsize(file_path),
+        width=width,
+        height=height,
+        file_path=file_path,
+        sha256=sha256,
+        order=order,
+        uploaded_by=uploaded_by
+    )
+
+    derived_path = thumbnail_path(thumbnails_dir(image), file_path, 'small', gallery.thumbnail_quality)
+    derived = (db.session.query(Image.preview, Image.dominant_color, Image.derivative_manifest)
+               .filter(Image.sha256 == sha256, Image.preview.isnot(None)).first())
+    if os.path.exists(derived_path) and derived:
+        image.preview, image.dominant_color, image.derivative_manifest = derived
+        image.derivative_status = 'ready'
+    else:
+        image.derivative_status = 'pending'
+    return image
+
+
+def store_image(gallery, sha256, original_filename, uploaded_by):
+    image = new_image(gallery, sha256, original_filename, uploaded_by, next_order(gallery.id)[0])
+
+    add_reference(sha256)
+    db.session.add(image)
+    adjust_counters(gallery.id, images=1, visible=1, size=image.file_size)
+    db.session.commit()
+
+    invalidate(gallery_id=gallery.id)
+
+    if image.derivative_status == 'pending':
+        enqueue_derivatives(image)
+
+    return image
+
+
+def upload_response(image):
+    return {
+        'id': image.id,
+        'filename': image.filename,
+        'original_filename': image.original_filename,
+        'width': image.width,
+        'height': image.height,
+        'file_size': image.file_size,
+        'status': 'ready' if image.derivative_status == 'ready' else 'processing',
+        'message': 'Image uploaded successfully'
+    }
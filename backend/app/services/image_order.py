@@ -0,0 +1,99 @@
+from redis import Redis
+from flask import current_app
+from app.models import db, Gallery, Image
+from app.services.cache_namespaces import invalidate
+
+
+# Orders are spaced ORDER_GAP apart so a move can take the midpoint of its new neighbours.
+ORDER_GAP = 1024
+MIN_ORDER_GAP = 8
+REBALANCE_KEY = 'order_rebalance'
+
+
+def lock_gallery(gallery_id):
+    # Locking the gallery row serializes order allocation, moves and rebalances within one gallery.
+    Gallery.query.filter_by(id=gallery_id).with_for_update().first()
+
+
+def next_order(gallery_id, count=1):
+    lock_gallery(gallery_id)
+    max_order = db.session.query(db.func.max(Image.order)).filter_by(gallery_id=gallery_id).scalar() or 0
+    return [max_order + ORDER_GAP * offset for offset in range(1, count + 1)]
+
+
+def write_positions(gallery_id, image_ids):
+    positions = {image_id: ORDER_GAP * position for position, image_id in enumerate(image_ids, start=1)}
+    Image.query.filter(Image.gallery_id == gallery_id, Image.id.in_(image_ids)).update(
+        {Image.order: db.case(positions, value=Image.id)}, synchronize_session=False
+    )
+
+
+def rebalance(gallery_id):
+    image_ids = [image_id for image_id, in db.session.query(Image.id)
+                 .filter(Image.gallery_id == gallery_id).order_by(Image.order, Image.id)]
+    write_positions(gallery_id, image_ids)
+    return len(image_ids)
+
+
+def _following(gallery_id, image, after):
+    query = db.session.query(Image.order).filter(Image.gallery_id == gallery_id, Image.id != image.id)
+    if after:
+        query = query.filter(Image.order >= after.order,
+                             db.or_(Image.order > after.order, Image.id > after.id))
+    row = query.order_by(Image.order, Image.id).first()
+    return row.order if row else None
+
+
+def _slot(gallery_id, image, after):
+    previous = after.order if after else None
+    following = _following(gallery_id, image, after)
+
+    if previous is None and following is None:
+        return ORDER_GAP, False
+    if previous is None:
+        return following - ORDER_GAP, False
+    if following is None:
+        return previous + ORDER_GAP, False
+    if following - previous < 2:
+        return None, True
+
+    order = (previous + following) // 2
+    return order, min(order - previous, following - order) < MIN_ORDER_GAP
+
+
+def move_image(image, after):
+    lock_gallery(image.gallery_id)
+
+    order, crowded = _slot(image.gallery_id, image, after)
+    if order is None:
+        rebalance(image.gallery_id)
+        db.session.expire_all()
+        order, crowded = _slot(image.gallery_id, image, after)
+
+    image.order = order
+    db.session.commit()
+
+    invalidate(gallery_id=image.gallery_id)
+    if crowded:
+        request_rebalance(image.gallery_id)
+    return order
+
+
+def request_rebalance(gallery_id):
+    Redis.from_url(current_app.config['REDIS_URL']).sadd(REBALANCE_KEY, gallery_id)
+
+
+def rebalance_pending():
+    redis_client = Redis.from_url(current_app.config['REDIS_URL'])
+    rebalanced = 0
+    while gallery_id := redis_client.spop(REBALANCE_KEY):
+        rebalance_gallery(int(gallery_id))
+        rebalanced += 1
+    return rebalanced
+
+
+def rebalance_gallery(gallery_id):
+    lock_gallery(gallery_id)
+    rebalance(gallery_id)
+    db.session.commit()
+    invalidate(gallery_id=gallery_id)
@@ -1,6 +1,12 @@
+import base64
+import io
 import os
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
-from app import cache
+import glob
+import secrets
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, features
 
 
 THUMBNAIL_SIZES = {
@@ -9,57 +15,176 @@ THUMBNAIL_SIZES = {
     'large': (800, 800)
 }
 
+PLACEHOLDER_COLOR = (224, 224, 224)
+PREVIEW_SIZE = 16
+PREVIEW_QUALITY = 40
+PREVIEW_COLORS = 8
+KNOWN_DERIVATIVES_SIZE = 4096
 
-def generate_thumbnail(image_path, output_dir, size='medium', quality=85):
-    cache_key = f'thumbnail:{image_path}:{size}:{quality}'
-    cached_path = cache.get(cache_key)
-    if cached_path and os.path.exists(cached_path):
-        return cached_path
+IMAGE_FORMATS = {
+    'avif': {'pillow': 'AVIF', 'extension': 'avif', 'mimetype': 'image/avif', 'options': {'speed': 6}},
+    'webp': {'pillow': 'WEBP', 'extension': 'webp', 'mimetype': 'image/webp', 'options': {'method': 4}},
+    'jpeg': {'pillow': 'JPEG', 'extension': 'jpg', 'mimetype': 'image/jpeg', 'options': {'optimize': True}},
+}
+
+
+@lru_cache(maxsize=1)
+def supported_formats():
+    return tuple(fmt for fmt in IMAGE_FORMATS if fmt == 'jpeg' or features.check(fmt))
+
+
+def negotiate_format(accept_mimetypes):
+    accepted = {value for value, quality in accept_mimetypes if quality > 0}
+    for fmt in supported_formats():
+        if IMAGE_FORMATS[fmt]['mimetype'] in accepted:
+            return fmt
+    return 'jpeg'
+
+
+def is_readable_image(path):
+    try:
+        with Image.open(path) as img:
+            img.verify()
+    except Exception:
+        return False
+    return True
+
+
+def save_image(img, output_path, fmt, quality):
+    spec = IMAGE_FORMATS[fmt]
+    img.save(output_path, spec['pillow'], quality=quality, **spec['options'])
 
+
+def save_image_atomic(img, output_path, fmt, quality):
+    # Readers treat an existing derivative as finished, so it only appears once fully written.
+    partial_path = f'{output_path}.{secrets.token_hex(4)}.part'
+    try:
+        save_image(img, partial_path, fmt, quality)
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def thumbnail_path(output_dir, image_path, size, quality=85, fmt='jpeg'):
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(output_dir, f"{name}_{size}_q{quality}.{IMAGE_FORMATS[fmt]['extension']}")
+
+
+def derivative_files(output_dir, image_path):
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    return glob.glob(os.path.join(glob.escape(output_dir), f"{glob.escape(name)}_*")) + \
+        glob.glob(os.path.join(glob.escape(output_dir), f"{glob.escape(name)}.*"))
+
+
+def render_thumbnail(image_path, output_dir, size='medium', quality=85, fmt='jpeg'):
     os.makedirs(output_dir, exist_ok=True)
+    output_path = thumbnail_path(output_dir, image_path, size, quality, fmt)
 
     with Image.open(image_path) as img:
+        img.draft('RGB', THUMBNAIL_SIZES[size])
         img = img.convert('RGB')
         img.thumbnail(THUMBNAIL_SIZES[size], Image.Resampling.LANCZOS)
+        save_image_atomic(img, output_path, fmt, quality)
 
-        filename = os.path.basename(image_path)
-        name, ext = os.path.splitext(filename)
-        output_filename = f"{name}_{size}{ext}"
-        output_path = os.path.join(output_dir, output_filename)
+    return output_path
 
-        img.save(output_path, 'JPEG', quality=quality, optimize=True)
 
-    cache.set(cache_key, output_path, timeout=3600)
-    return output_path
+def render_thumbnails(image_path, output_dir, quality=85, formats=('jpeg',)):
+    os.makedirs(output_dir, exist_ok=True)
+    sizes = sorted(THUMBNAIL_SIZES, key=lambda size: THUMBNAIL_SIZES[size], reverse=True)
+    paths = {}
+
+    with Image.open(image_path) as img:
+        img.draft('RGB', THUMBNAIL_SIZES[sizes[0]])
+        current = img.convert('RGB')
+
+    for size in sizes:
+        current.thumbnail(THUMBNAIL_SIZES[size], Image.Resampling.LANCZOS)
+        paths[size] = {}
+        for fmt in formats:
+            paths[size][fmt] = thumbnail_path(output_dir, image_path, size, quality, fmt)
+            save_image_atomic(current, paths[size][fmt], fmt, quality)
+
+    return paths
 
 
-def apply_watermark(image_path, output_path, text='', opacity=30):
+def image_preview(image_path):
     with Image.open(image_path) as img:
-        img = img.convert('RGBA')
+        img.draft('RGB', (PREVIEW_SIZE, PREVIEW_SIZE))
+        img = img.convert('RGB')
+    img.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.Resampling.LANCZOS)
+
+    quantized = img.quantize(PREVIEW_COLORS)
+    _, index = max(quantized.getcolors())
+    dominant_color = '#{:02x}{:02x}{:02x}'.format(*quantized.getpalette()[index * 3:index * 3 + 3])
+
+    fmt = 'webp' if 'webp' in supported_formats() else 'jpeg'
+    buffer = io.BytesIO()
+    img.save(buffer, IMAGE_FORMATS[fmt]['pillow'], quality=PREVIEW_QUALITY)
+    data = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f"data:{IMAGE_FORMATS[fmt]['mimetype']};base64,{data}", dominant_color
+
 
-        watermark_layer = Image.new('RGBA', img.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(watermark_layer)
+def derivative_key(size, quality, fmt):
+    return f'{size}:{quality}:{fmt}'
 
-        img_width, img_height = img.size
-        font_size = max(20, img_width // 30)
 
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+def derivative_manifest(quality, formats):
+    return sorted(derivative_key(size, quality, fmt) for size in THUMBNAIL_SIZES for fmt in formats)
 
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
 
-        x = img_width - text_width - 20
-        y = img_height - text_height - 20
+# Per-process LRU of derivative paths known to exist. Entries go stale when a purged blob's
+# derivatives are deleted; re-uploading the same bytes resolves to the same paths again, but
+# such images stay pending until the worker re-renders them, so hits are verified until then.
+_known_derivatives = OrderedDict()
+_known_derivatives_lock = threading.Lock()
 
-        alpha = int(255 * (opacity / 100))
-        draw.text((x, y), text, fill=(255, 255, 255, alpha), font=font)
 
-        watermarked = Image.alpha_composite(img, watermark_layer)
-        watermarked = watermarked.convert('RGB')
-        watermarked.save(output_path, 'JPEG', quality=95, optimize=True)
+def _remember(path):
+    with _known_derivatives_lock:
+        _known_derivatives[path] = True
+        _known_derivatives.move_to_end(path)
+        if len(_known_derivatives) > KNOWN_DERIVATIVES_SIZE:
+            _known_derivatives.popitem(last=False)
 
+
+def forget_derivatives(paths):
+    with _known_derivatives_lock:
+        for path in paths:
+            _known_derivatives.pop(path, None)
+
+
+def derivative_exists(path, verify=False):
+    with _known_derivatives_lock:
+        if path in _known_derivatives:
+            _known_derivatives.move_to_end(path)
+            if not verify:
+                return True
+    if os.path.exists(path):
+        _remember(path)
+        return True
+    forget_derivatives([path])
+    return False
+
+
+def generate_thumbnail(image_path, output_dir, size='medium', quality=85, fmt='jpeg'):
+    output_path = thumbnail_path(output_dir, image_path, size, quality, fmt)
+    if not derivative_exists(output_path, verify=True):
+        render_thumbnail(image_path, output_dir, size, quality, fmt)
+        _remember(output_path)
     return output_path
+
+
+def placeholder_dimensions(width, height, size):
+    box_width, box_height = THUMBNAIL_SIZES[size]
+    scale = min(box_width / width, box_height / height, 1)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+@lru_cache(maxsize=64)
+def render_placeholder(width, height):
+    img = Image.new('RGB', (width, height), PLACEHOLDER_COLOR)
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=50)
+    return buffer.getvalue()
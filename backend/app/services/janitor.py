@@ -0,0 +1,129 @@
+import glob
+import os
+import re
+import time
+from redis import Redis
+from flask import current_app
+from app.models import db, Gallery
+
+
+ACCESS_RESOLUTION = 3600
+ZIP_NAME = re.compile(r'^(\d+)-\w+-(\w+)\.zip$')
+
+
+def record_access(path):
+    # Explicit atime updates work regardless of relatime/noatime mounts; mtime is left alone
+    # because it feeds the file ETag.
+    try:
+        stat = os.stat(path)
+        if time.time() - stat.st_atime > ACCESS_RESOLUTION:
+            os.utime(path, (time.time(), stat.st_mtime))
+    except FileNotFoundError:
+        pass
+
+
+def _artifact_patterns():
+    config = current_app.config
+    return {
+        'zips': ([os.path.join(config['ZIP_OUTPUT_PATH'], '*')], config['ZIP_DISK_BUDGET']),
+        'watermarked': ([os.path.join(config['GALLERY_DATA_PATH'], '*', 'watermarked', '*', '*')],
+                        config['WATERMARK_DISK_BUDGET']),
+        'responsive': ([os.path.join(config['RESPONSIVE_CACHE_PATH'], '*', '*')], config['RESPONSIVE_DISK_BUDGET']),
+        'derivative_partials': ([os.path.join(config['DERIVATIVE_PATH'], '*', '*.part'),
+                                 os.path.join(config['GALLERY_DATA_PATH'], '*', 'thumbnails', '*.part')], None),
+        'temp_uploads': ([os.path.join(config['TEMP_UPLOAD_PATH'], '*')], None),
+    }
+
+
+def _scan(patterns):
+    files = []
+    for path in (path for pattern in patterns for path in glob.glob(pattern)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((path, stat.st_size, max(stat.st_atime, stat.st_mtime)))
+    return files
+
+
+def _stale_partials(files, now):
+    # Writes in progress keep touching their .part file; one left untouched belongs to a dead process.
+    return [f for f in files if f[0].endswith('.part') and now - f[2] > current_app.config['ARTIFACT_ORPHAN_AGE']]
+
+
+def _orphaned_zips(files, redis_client, gallery_ids, now):
+    orphans = []
+    for path, size, accessed_at in files:
+        match = ZIP_NAME.match(os.path.basename(path))
+        if not match:
+            # Leftover .part files from builds that are no longer running.
+            if now - accessed_at > current_app.config['ARTIFACT_ORPHAN_AGE']:
+                orphans.append((path, size, accessed_at))
+        elif int(match.group(1)) not in gallery_ids:
+            orphans.append((path, size, accessed_at))
+        elif (not redis_client.exists(f'zip_task:{match.group(2)}')
+              and now - accessed_at > current_app.config['ARTIFACT_ORPHAN_AGE']):
+            orphans.append((path, size, accessed_at))
+    return orphans
+
+
+def _orphans(category, files, now):
+    if category == 'zips':
+        redis_client = Redis.from_url(current_app.config['REDIS_URL'])
+        gallery_ids = {gallery_id for gallery_id, in db.session.query(Gallery.id)}
+        return _orphaned_zips(files, redis_client, gallery_ids, now)
+    if category == 'temp_uploads':
+        return [f for f in files if now - f[2] > current_app.config['UPLOAD_SESSION_TTL']]
+    return _stale_partials(files, now)
+
+
+def _evictions(files, orphans, budget):
+    orphan_paths = {path for path, _, _ in orphans}
+    # Partial files belong to builds that may still be running; only the orphan age removes them.
+    remaining = sorted((f for f in files if f[0] not in orphan_paths and not f[0].endswith('.part')),
+                       key=lambda f: f[2])
+    used = sum(size for _, size, _ in remaining)
+
+    evicted = []
+    while budget is not None and used > budget and remaining:
+        path, size, accessed_at = remaining.pop(0)
+        evicted.append((path, size, accessed_at))
+        used -= size
+    return evicted
+
+
+def plan_cleanup():
+    now = time.time()
+    plan = {}
+    for category, (patterns, budget) in _artifact_patterns().items():
+        files = _scan(patterns)
+        orphans = _orphans(category, files, now)
+        plan[category] = {
+            'files': files,
+            'budget': budget,
+            'remove': orphans + _evictions(files, orphans, budget),
+        }
+    return plan
+
+
+def storage_report():
+    return {category: {
+        'files': len(entry['files']),
+        'bytes': sum(size for _, size, _ in entry['files']),
+        'budget': entry['budget'],
+        'reclaimable': sum(size for _, size, _ in entry['remove']),
+    } for category, entry in plan_cleanup().items()}
+
+
+def run_cleanup():
+    removed = {}
+    for category, entry in plan_cleanup().items():
+        freed = 0
+        for path, size, _ in entry['remove']:
+            try:
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+        removed[category] = freed
+    return removed
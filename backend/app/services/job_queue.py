@@ -0,0 +1,30 @@
+import json
+from redis import Redis
+
+
+def queue_key(queue_name):
+    return f'job_queue:{queue_name}'
+
+
+def enqueue_job(redis_url, queue_name, payload):
+    Redis.from_url(redis_url).rpush(queue_key(queue_name), json.dumps(payload))
+
+
+def enqueue_jobs(redis_url, queue_name, payloads):
+    if payloads:
+        Redis.from_url(redis_url).rpush(queue_key(queue_name), *(json.dumps(payload) for payload in payloads))
+
+
+def dequeue_jobs(redis_client, queue_name, limit, timeout=5):
+    item = redis_client.blpop(queue_key(queue_name), timeout=timeout)
+    if not item:
+        return []
+
+    jobs = [json.loads(item[1])]
+    while len(jobs) < limit:
+        raw = redis_client.lpop(queue_key(queue_name))
+        if not raw:
+            break
+        jobs.append(json.loads(raw))
+
+    return jobs
@@ -0,0 +1,75 @@
+import os
+import secrets
+from PIL import Image
+from flask import current_app
+from app.services.image_processor import IMAGE_FORMATS, THUMBNAIL_SIZES, save_image
+from app.services.watermark import watermark_image, watermark_settings, settings_dir
+from app.services.janitor import record_access
+
+
+def width_ladder(gallery, full_resolution):
+    widths = current_app.config['RESPONSIVE_WIDTHS']
+    if gallery.thumbnail_only and not full_resolution:
+        # Thumbnail-only galleries never hand out more than the large thumbnail.
+        widths = tuple(width for width in widths if width <= THUMBNAIL_SIZES['large'][0]) or widths[:1]
+    return widths
+
+
+def srcset_widths(image_width, ladder):
+    widths = [width for width in ladder if width < image_width]
+    # The first rung at or above the original is served at the original's width.
+    larger = [width for width in ladder if width >= image_width]
+    return widths + larger[:1]
+
+
+def srcset(gallery_id, image_id, image_width, version, ladder):
+    if not image_width:
+        return None
+    return ', '.join(f'/images/w/{gallery_id}/{image_id}/{width}?v={version} {min(width, image_width)}w'
+                     for width in srcset_widths(image_width, ladder))
+
+
+def needs_watermark(gallery, width, full_resolution):
+    # Sizes up to the large thumbnail are unwatermarked, matching serve_thumbnail.
+    return gallery.watermark_enabled and not full_resolution and width > THUMBNAIL_SIZES['large'][0]
+
+
+def responsive_path(gallery, image, width, fmt, watermarked):
+    source = image.sha256 or f'image-{image.id}'
+    name = f"{source}_{width}w_q{gallery.thumbnail_quality}"
+    if watermarked:
+        name += f'_{os.path.basename(settings_dir(gallery))}'
+    return os.path.join(current_app.config['RESPONSIVE_CACHE_PATH'], source[:2],
+                        f"{name}.{IMAGE_FORMATS[fmt]['extension']}")
+
+
+def render_responsive(image_path, output_path, width, quality, fmt, watermark=None):
+    with Image.open(image_path) as img:
+        height = max(1, round(img.height * width / img.width))
+        img.draft('RGB', (width, height))
+        img = img.convert('RGB')
+        img.thumbnail((width, img.height), Image.Resampling.LANCZOS)
+
+    if watermark:
+        img = watermark_image(img, *watermark)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    partial_path = f'{output_path}.{secrets.token_hex(4)}.part'
+    try:
+        save_image(img, partial_path, fmt, quality)
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return output_path
+
+
+def responsive_variant(gallery, image, width, fmt, full_resolution):
+    watermarked = needs_watermark(gallery, width, full_resolution)
+    output_path = responsive_path(gallery, image, width, fmt, watermarked)
+    if os.path.exists(output_path):
+        record_access(output_path)
+    else:
+        render_responsive(image.file_path, output_path, width, gallery.thumbnail_quality, fmt,
+                          watermark_settings(gallery) if watermarked else None)
+    return output_path
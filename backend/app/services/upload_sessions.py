@@ -0,0 +1,123 @@
+import hashlib
+import os
+import secrets
+from contextlib import contextmanager
+from redis import Redis
+from flask import current_app
+
+
+STREAM_READ_SIZE = 65536
+CHUNK_LOCK_TIMEOUT = 300
+
+
+def _redis():
+    return Redis.from_url(current_app.config['REDIS_URL'])
+
+
+def _session_key(upload_id):
+    return f'upload_session:{upload_id}'
+
+
+def _lock_key(upload_id):
+    return f'upload_lock:{upload_id}'
+
+
+def temp_path(upload_id):
+    return os.path.join(current_app.config['TEMP_UPLOAD_PATH'], f'{upload_id}.part')
+
+
+def create_session(gallery_id, filename, total_size, checksum, admin_id):
+    upload_id = secrets.token_urlsafe(16)
+    session = {
+        'upload_id': upload_id,
+        'gallery_id': gallery_id,
+        'filename': filename,
+        'total_size': total_size,
+        'checksum': checksum or '',
+        'admin_id': admin_id,
+    }
+
+    open(temp_path(upload_id), 'wb').close()
+
+    redis_client = _redis()
+    redis_client.hset(_session_key(upload_id), mapping=session)
+    redis_client.expire(_session_key(upload_id), current_app.config['UPLOAD_SESSION_TTL'])
+
+    session['offset'] = 0
+    return session
+
+
+def get_session(upload_id):
+    raw = _redis().hgetall(_session_key(upload_id))
+    if not raw:
+        return None
+
+    session = {key.decode('utf-8'): value.decode('utf-8') for key, value in raw.items()}
+    session['gallery_id'] = int(session['gallery_id'])
+    session['total_size'] = int(session['total_size'])
+    session['admin_id'] = int(session['admin_id'])
+
+    session['offset'] = current_offset(upload_id)
+    return session
+
+
+def current_offset(upload_id):
+    path = temp_path(upload_id)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+@contextmanager
+def chunk_lock(upload_id):
+    # A retried chunk can race the original request; only one writer per upload gets through.
+    redis_client = _redis()
+    token = secrets.token_hex(8)
+    acquired = redis_client.set(_lock_key(upload_id), token, nx=True, ex=CHUNK_LOCK_TIMEOUT)
+    try:
+        yield bool(acquired)
+    finally:
+        if acquired and redis_client.get(_lock_key(upload_id)) == token.encode('utf-8'):
+            redis_client.delete(_lock_key(upload_id))
+
+
+def write_chunk(session, offset, stream, length, checksum=''):
+    upload_id = session['upload_id']
+    digest = hashlib.sha256()
+    written = 0
+
+    # Writing at the declared offset rather than appending means a duplicate chunk overwrites itself.
+    with open(temp_path(upload_id), 'r+b') as f:
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(STREAM_READ_SIZE, length - written))
+            if not data:
+                break
+            digest.update(data)
+            f.write(data)
+            written += len(data)
+
+        if checksum and (written < length or digest.hexdigest() != checksum):
+            f.truncate(offset)
+            return None
+        f.truncate(offset + written)
+
+    _redis().expire(_session_key(upload_id), current_app.config['UPLOAD_SESSION_TTL'])
+    return offset + written
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(current_app.config['CHUNK_SIZE']):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def session_checksum(session):
+    return file_checksum(temp_path(session['upload_id']))
+
+
+def discard_session(upload_id):
+    path = temp_path(upload_id)
+    if os.path.exists(path):
+        os.remove(path)
+    _redis().delete(_session_key(upload_id))
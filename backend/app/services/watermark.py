@@ -0,0 +1,111 @@
+import glob
+import hashlib
+import os
+import shutil
+import secrets
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+from flask import current_app
+from app.services.image_processor import IMAGE_FORMATS, save_image
+
+
+FONT_PATH = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+FONT_SIZE_STEP = 8
+MIN_FONT_SIZE = 20
+MARGIN = 20
+QUALITY = 95
+# Full-size AVIF/WebP encodes can hold a request for tens of seconds, so full-size copies stay JPEG.
+WATERMARK_FORMAT = 'jpeg'
+# Bump when the rendering changes so cached outputs are not reused.
+ENGINE_VERSION = 2
+
+
+@lru_cache(maxsize=16)
+def _font(size):
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def font_size_bucket(image_width):
+    size = max(MIN_FONT_SIZE, image_width // 30)
+    return max(MIN_FONT_SIZE, size - size % FONT_SIZE_STEP)
+
+
+@lru_cache(maxsize=64)
+def text_overlay(text, opacity, font_size):
+    font = _font(font_size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+
+    tile = Image.new('RGBA', (max(1, right - left), max(1, bottom - top)), (255, 255, 255, 0))
+    ImageDraw.Draw(tile).text((-left, -top), text, fill=(255, 255, 255, int(255 * (opacity / 100))), font=font)
+    return tile
+
+
+def watermark_image(img, text, opacity):
+    img = img.convert('RGB')
+    tile = text_overlay(text, opacity, font_size_bucket(img.width))
+    position = (img.width - tile.width - MARGIN, img.height - tile.height - MARGIN)
+    # Pasting through the tile's alpha blends only the text's bounding box.
+    img.paste(tile, position, tile)
+    return img
+
+
+def _write_atomic(img, output_path, fmt):
+    partial_path = f'{output_path}.{secrets.token_hex(4)}.part'
+    try:
+        save_image(img, partial_path, fmt, QUALITY)
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def render_watermarks(image_path, outputs, text, opacity):
+    with Image.open(image_path) as img:
+        watermarked = watermark_image(img, text, opacity)
+
+    for fmt, output_path in outputs.items():
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _write_atomic(watermarked, output_path, fmt)
+    return outputs
+
+
+def apply_watermark(image_path, output_path, text='', opacity=30, fmt=WATERMARK_FORMAT):
+    return render_watermarks(image_path, {fmt: output_path}, text, opacity)[fmt]
+
+
+def watermark_settings(gallery):
+    return gallery.watermark_text or gallery.name, gallery.watermark_opacity
+
+
+def _root(gallery_id):
+    return os.path.join(current_app.config['GALLERY_DATA_PATH'], str(gallery_id), 'watermarked')
+
+
+def settings_dir(gallery):
+    text, opacity = watermark_settings(gallery)
+    digest = hashlib.sha1(f'{ENGINE_VERSION}:{opacity}:{text}'.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(_root(gallery.id), digest)
+
+
+def watermarked_path(gallery, image, fmt):
+    name = os.path.splitext(image.filename)[0]
+    return os.path.join(settings_dir(gallery), f"{name}.{IMAGE_FORMATS[fmt]['extension']}")
+
+
+def watermark_files(gallery_id, image):
+    name = glob.escape(os.path.splitext(image.filename)[0])
+    return glob.glob(os.path.join(glob.escape(_root(gallery_id)), '*', f'{name}.*'))
+
+
+def remove_stale_watermarks(gallery):
+    current = settings_dir(gallery)
+    for path in glob.glob(os.path.join(glob.escape(_root(gallery.id)), '*')):
+        if path == current:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
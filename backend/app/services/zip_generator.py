@@ -1,42 +1,76 @@
+import glob
+import hashlib
+import hmac
 import os
-import threading
-from datetime import datetime
-from stream_zip import stream_zip, ZIP_64
-from redis import Redis
+from stream_zip import stream_zip, ZIP_64, NO_COMPRESSION_64
 from flask import current_app
+from app.models import db, Image, Blob
 
 
-def create_zip_task(gallery, images, task_id, redis_url):
-    def generate_zip():
-        try:
-            redis_client = Redis.from_url(redis_url)
-            redis_client.setex(f'zip_task:{task_id}', 3600, 'processing')
+STORED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+READ_SIZE = 65536
 
-            zip_filename = f"{gallery.slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-            zip_path = os.path.join(current_app.config['ZIP_OUTPUT_PATH'], zip_filename)
 
-            def member_files():
-                for image in images:
-                    file_path = image.file_path
-                    modified_at = image.uploaded_at.timestamp()
-                    perms = 0o600
+def zip_entries(gallery, include_hidden=False):
+    query = (db.session.query(Image.id, Image.is_hidden, Image.sha256, Image.original_filename,
+                              Image.uploaded_at, Image.file_path, Image.file_size, Blob.crc32)
+             .outerjoin(Blob, Image.sha256 == Blob.sha256)
+             .filter(Image.gallery_id == gallery.id))
+    if not include_hidden:
+        query = query.filter(Image.is_hidden.is_(False))
+    return query.order_by(Image.order, Image.id).all()
 
-                    def file_bytes():
-                        with open(file_path, 'rb') as f:
-                            while chunk := f.read(65536):
-                                yield chunk
 
-                    yield image.original_filename, modified_at, perms, ZIP_64, file_bytes()
+def archive_fingerprint(entries):
+    digest = hmac.new(current_app.config['SECRET_KEY'].encode('utf-8'), digestmod=hashlib.sha256)
+    # Positions rather than raw orders, so a rebalance that keeps the sequence keeps the cached ZIP.
+    for position, entry in enumerate(entries):
+        content = entry.sha256 or f'{entry.file_path}:{entry.file_size}:{entry.uploaded_at.isoformat()}'
+        digest.update(f'{entry.id}:{position}:{entry.is_hidden}:{content}:{entry.original_filename}\n'.encode('utf-8'))
+    return digest.hexdigest()[:32]
 
-            with open(zip_path, 'wb') as f:
-                for chunk in stream_zip(member_files()):
-                    f.write(chunk)
 
-            redis_client.setex(f'zip_task:{task_id}', 3600, f'ready:{zip_filename}')
+def archive_scope(include_hidden):
+    return 'all' if include_hidden else 'visible'
 
-        except Exception as e:
-            redis_client.setex(f'zip_task:{task_id}', 3600, f'error:{str(e)}')
 
-    thread = threading.Thread(target=generate_zip)
-    thread.start()
-    return thread
+def archive_path(gallery_id, scope, fingerprint):
+    return os.path.join(current_app.config['ZIP_OUTPUT_PATH'], f'{gallery_id}-{scope}-{fingerprint}.zip')
+
+
+def cached_archive(gallery_id, scope, fingerprint):
+    path = archive_path(gallery_id, scope, fingerprint)
+    return path if os.path.exists(path) else None
+
+
+def remove_archives(gallery_id):
+    for path in glob.glob(os.path.join(current_app.config['ZIP_OUTPUT_PATH'], f'{gallery_id}-*.zip')):
+        os.remove(path)
+
+
+def _is_stored(entry):
+    extension = entry.original_filename.rsplit('.', 1)[-1].lower()
+    return extension in STORED_EXTENSIONS and entry.crc32 is not None
+
+
+def _file_bytes(path):
+    with open(path, 'rb') as f:
+        while chunk := f.read(READ_SIZE):
+            yield chunk
+
+
+def zip_members(entries):
+    # Images are already compressed, so store them when the CRC is known up front.
+    for entry in entries:
+        method = NO_COMPRESSION_64(entry.file_size, entry.crc32) if _is_stored(entry) else ZIP_64
+        yield entry.original_filename, entry.uploaded_at, 0o600, method, _file_bytes(entry.file_path)
+
+
+def zip_size(entries):
+    if not all(_is_stored(entry) for entry in entries):
+        return None
+
+    # Stored ZIP64 headers have a fixed size, so the archive is its headers plus the raw file sizes.
+    headers = stream_zip((entry.original_filename, entry.uploaded_at, 0o600, NO_COMPRESSION_64(0, 0), ())
+                         for entry in entries)
+    return sum(len(chunk) for chunk in headers) + sum(entry.file_size for entry in entries)
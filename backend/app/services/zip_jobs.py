@@ -0,0 +1,209 @@
+import glob
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from redis import Redis
+from stream_zip import stream_zip
+from flask import current_app
+from app.models import db, Gallery
+from app.services.job_queue import queue_key, enqueue_job, dequeue_jobs
+from app.services.zip_generator import (
+    zip_entries, zip_members, zip_size, archive_fingerprint, archive_path
+)
+
+
+ZIP_QUEUE = 'zips'
+ZIP_TASK_TTL = 3600
+ACTIVE_STATUSES = ('queued', 'processing')
+PROGRESS_INTERVAL = 1.0
+STALL_TIMEOUT = 60
+INT_FIELDS = ('gallery_id', 'images_total', 'images_done', 'bytes_total', 'bytes_written')
+FLOAT_FIELDS = ('created_at', 'started_at', 'updated_at', 'polled_at')
+
+
+class ZipCancelled(Exception):
+    pass
+
+
+def _redis():
+    return Redis.from_url(current_app.config['REDIS_URL'])
+
+
+def _task_key(task_id):
+    return f'zip_task:{task_id}'
+
+
+def get_task(redis_client, task_id):
+    raw = redis_client.hgetall(_task_key(task_id))
+    if not raw:
+        return None
+
+    task = {key.decode('utf-8'): value.decode('utf-8') for key, value in raw.items()}
+    for field in INT_FIELDS:
+        if field in task:
+            task[field] = int(task[field])
+    for field in FLOAT_FIELDS:
+        if field in task:
+            task[field] = float(task[field])
+    task['task_id'] = task_id
+    return task
+
+
+def update_task(redis_client, task_id, **fields):
+    fields['updated_at'] = time.time()
+    redis_client.hset(_task_key(task_id), mapping={key: str(value) for key, value in fields.items()})
+    redis_client.expire(_task_key(task_id), ZIP_TASK_TTL)
+
+
+def _is_live(task):
+    if not task or task['status'] not in ACTIVE_STATUSES:
+        return False
+    # A processing task that stopped reporting belongs to a worker that died mid-build.
+    return task['status'] == 'queued' or time.time() - task['updated_at'] < STALL_TIMEOUT
+
+
+def request_zip_build(gallery, entries, scope):
+    task_id = archive_fingerprint(entries)
+    zip_path = archive_path(gallery.id, scope, task_id)
+    redis_client = _redis()
+    task = get_task(redis_client, task_id)
+    fields = {
+        'gallery_id': gallery.id,
+        'scope': scope,
+        'download_name': f'{gallery.slug}.zip',
+        'images_total': len(entries),
+        'bytes_total': zip_size(entries) or sum(entry.file_size for entry in entries),
+        'polled_at': time.time(),
+    }
+
+    if os.path.exists(zip_path):
+        update_task(redis_client, task_id, status='ready', filename=os.path.basename(zip_path),
+                    images_done=len(entries), bytes_written=os.path.getsize(zip_path), **fields)
+        return get_task(redis_client, task_id)
+
+    if _is_live(task):
+        update_task(redis_client, task_id, polled_at=time.time())
+        return get_task(redis_client, task_id)
+
+    if redis_client.llen(queue_key(ZIP_QUEUE)) >= current_app.config['ZIP_QUEUE_LIMIT']:
+        return None
+
+    if task:
+        redis_client.delete(_task_key(task_id))
+    if redis_client.hsetnx(_task_key(task_id), 'status', 'queued'):
+        update_task(redis_client, task_id, created_at=time.time(), images_done=0, bytes_written=0, **fields)
+        enqueue_job(current_app.config['REDIS_URL'], ZIP_QUEUE, {'task_id': task_id})
+    return get_task(redis_client, task_id)
+
+
+def cancel_task(redis_client, task_id, reason='Cancelled'):
+    task = get_task(redis_client, task_id)
+    if not task or task['status'] not in ACTIVE_STATUSES:
+        return False
+    update_task(redis_client, task_id, status='cancelled', error=reason)
+    return True
+
+
+def _check_cancelled(redis_client, task_id):
+    task = get_task(redis_client, task_id)
+    if not task or task['status'] == 'cancelled':
+        raise ZipCancelled()
+    if time.time() - task['polled_at'] > current_app.config['ZIP_ABANDON_TIMEOUT']:
+        cancel_task(redis_client, task_id, 'Abandoned')
+        raise ZipCancelled()
+
+
+def _tracked_members(entries, progress):
+    for member in zip_members(entries):
+        yield member
+        progress['images_done'] += 1
+
+
+def _write_archive(redis_client, task_id, entries, partial_path):
+    progress = {'images_done': 0, 'bytes_written': 0}
+    last_report = time.monotonic()
+
+    with open(partial_path, 'wb') as f:
+        for chunk in stream_zip(_tracked_members(entries, progress)):
+            f.write(chunk)
+            progress['bytes_written'] += len(chunk)
+
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                _check_cancelled(redis_client, task_id)
+                update_task(redis_client, task_id, **progress)
+                last_report = time.monotonic()
+
+    return progress
+
+
+def build_zip(redis_client, task_id):
+    task = get_task(redis_client, task_id)
+    if not task or task['status'] != 'queued':
+        return
+
+    gallery = db.session.get(Gallery, task['gallery_id'])
+    entries = zip_entries(gallery, task['scope'] == 'all') if gallery else []
+    if not entries or archive_fingerprint(entries) != task_id:
+        update_task(redis_client, task_id, status='error', error='Gallery changed before the archive was built')
+        return
+
+    zip_path = archive_path(gallery.id, task['scope'], task_id)
+    partial_path = f'{zip_path}.{secrets.token_hex(4)}.part'
+    update_task(redis_client, task_id, status='processing', started_at=time.time())
+
+    try:
+        progress = _write_archive(redis_client, task_id, entries, partial_path)
+        os.replace(partial_path, zip_path)
+    except ZipCancelled:
+        os.remove(partial_path)
+        return
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        update_task(redis_client, task_id, status='error', error=str(e))
+        return
+
+    # Archives of older versions of the same gallery and scope are superseded by this build.
+    for path in glob.glob(f"{zip_path.rsplit('-', 1)[0]}-*.zip"):
+        if path != zip_path:
+            os.remove(path)
+
+    update_task(redis_client, task_id, status='ready', filename=os.path.basename(zip_path), **progress)
+
+
+def task_progress(task):
+    progress = {field: task.get(field) for field in ('status', 'images_done', 'images_total',
+                                                      'bytes_written', 'bytes_total')}
+    progress['eta_seconds'] = None
+    if task['status'] == 'processing' and task.get('bytes_written') and task.get('started_at'):
+        elapsed = time.time() - task['started_at']
+        remaining = max(task['bytes_total'] - task['bytes_written'], 0)
+        progress['eta_seconds'] = round(elapsed * remaining / task['bytes_written'])
+    return progress
+
+
+def run_zip_worker(concurrency=None):
+    concurrency = concurrency or current_app.config['ZIP_WORKER_CONCURRENCY']
+    app = current_app._get_current_object()
+    redis_client = _redis()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def run(task_id):
+        try:
+            with app.app_context():
+                build_zip(redis_client, task_id)
+        except Exception:
+            app.logger.exception('ZIP build failed for task %s', task_id)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        while True:
+            slots.acquire()
+            jobs = dequeue_jobs(redis_client, ZIP_QUEUE, 1)
+            if jobs:
+                executor.submit(run, jobs[0]['task_id'])
+            else:
+                slots.release()
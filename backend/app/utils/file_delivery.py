@@ -0,0 +1,74 @@
+import os
+import mimetypes
+from urllib.parse import quote
+from flask import current_app, request, send_file, make_response
+from app.utils.ranges import parse_ranges, if_range_matches, range_response
+
+
+def internal_uri(path):
+    relative_path = os.path.relpath(os.path.realpath(path), os.path.realpath(current_app.config['FILE_DELIVERY_ROOT']))
+    if relative_path.startswith('..'):
+        raise ValueError(f'{path} is outside of {current_app.config["FILE_DELIVERY_ROOT"]}')
+    return f"{current_app.config['FILE_DELIVERY_INTERNAL_PREFIX'].rstrip('/')}/{quote(relative_path)}"
+
+
+def file_etag(stat):
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+
+def _guess_mimetype(path, download_name):
+    return mimetypes.guess_type(download_name or path)[0] or 'application/octet-stream'
+
+
+def _set_disposition(response, path, as_attachment, download_name):
+    if download_name or as_attachment:
+        response.headers.set(
+            'Content-Disposition', 'attachment' if as_attachment else 'inline',
+            filename=download_name or os.path.basename(path)
+        )
+
+
+def _proxy_response(path, mimetype, as_attachment, download_name):
+    response = make_response('')
+    response.mimetype = mimetype or _guess_mimetype(path, download_name)
+
+    if current_app.config['FILE_DELIVERY'] == 'x-accel':
+        response.headers['X-Accel-Redirect'] = internal_uri(path)
+    else:
+        response.headers['X-Sendfile'] = os.path.realpath(path)
+
+    _set_disposition(response, path, as_attachment, download_name)
+    return response
+
+
+def _multi_range_response(path, mimetype, as_attachment, download_name, etag, stat, ranges):
+    response = range_response(path, mimetype or _guess_mimetype(path, download_name), ranges, stat.st_size)
+    response.set_etag(etag)
+    response.last_modified = int(stat.st_mtime)
+    response.accept_ranges = 'bytes'
+    _set_disposition(response, path, as_attachment, download_name)
+    return response
+
+
+def _local_response(path, mimetype, as_attachment, download_name, etag):
+    stat = os.stat(path)
+    if etag is True:
+        etag = file_etag(stat)
+
+    ranges = parse_ranges(request.headers.get('Range'))
+    if request.method == 'GET' and ranges is not None and request.headers['Range'].count(',') \
+            and if_range_matches(etag, stat.st_mtime):
+        return _multi_range_response(path, mimetype, as_attachment, download_name, etag, stat, ranges)
+
+    return send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                     download_name=download_name, etag=etag)
+
+
+def deliver_file(path, mimetype=None, as_attachment=False, download_name=None, etag=True):
+    if current_app.config['FILE_DELIVERY'] == 'flask':
+        return _local_response(path, mimetype, as_attachment, download_name, etag)
+
+    response = _proxy_response(path, mimetype, as_attachment, download_name)
+    if isinstance(etag, str):
+        response.set_etag(etag)
+    return response
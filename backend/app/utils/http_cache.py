@@ -0,0 +1,38 @@
+import hashlib
+from flask import request, make_response
+from flask_login import current_user
+
+
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def image_version(image, gallery):
+    parts = [image.id, image.file_size, image.uploaded_at.isoformat(), gallery.thumbnail_quality]
+    if gallery.watermark_enabled:
+        parts += [gallery.watermark_text or gallery.name, gallery.watermark_opacity]
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+
+
+def image_etag(version, *variant):
+    return '-'.join([version, *variant])
+
+
+def cache_policy(gallery, version):
+    scope = 'public' if gallery.is_public and not current_user.is_authenticated else 'private'
+    if request.args.get('v') == version:
+        return f'{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'{scope}, no-cache'
+
+
+def apply_cache_headers(response, etag, policy, vary_accept=False):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = policy
+    if vary_accept:
+        response.vary.add('Accept')
+    return response
+
+
+def not_modified_response(etag, policy, vary_accept=False):
+    if not request.if_none_match.contains(etag):
+        return None
+    return apply_cache_headers(make_response('', 304), etag, policy, vary_accept)
@@ -0,0 +1,133 @@
+import secrets
+from datetime import datetime, timezone
+from flask import Response, request
+
+
+MAX_RANGES = 32
+READ_SIZE = 65536
+
+
+def parse_ranges(header):
+    if not header or not header.startswith('bytes='):
+        return None
+
+    ranges = []
+    for spec in header[len('bytes='):].split(','):
+        first, separator, last = spec.strip().partition('-')
+        if not separator or not (first or last):
+            return None
+        if not (first or '0').isdigit() or not (last or '0').isdigit():
+            return None
+
+        if not first:
+            if int(last) > 0:
+                ranges.append((-int(last), None))
+        elif not last:
+            ranges.append((int(first), None))
+        elif int(last) >= int(first):
+            ranges.append((int(first), int(last) + 1))
+        else:
+            return None
+    return ranges
+
+
+def normalize_ranges(ranges, size):
+    resolved = []
+    for start, stop in ranges:
+        if start < 0:
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            resolved.append((start, stop))
+
+    merged = []
+    for start, stop in sorted(resolved):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def if_range_matches(etag, mtime):
+    header = request.headers.get('If-Range')
+    if not header:
+        return True
+    if header.startswith('W/'):
+        return False
+
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    if if_range.date:
+        return if_range.date == datetime.fromtimestamp(int(mtime), timezone.utc)
+    return False
+
+
+def _read_range(f, start, stop):
+    f.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        chunk = f.read(min(READ_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _part_header(boundary, mimetype, start, stop, size):
+    return (
+        f'--{boundary}\r\n'
+        f'Content-Type: {mimetype}\r\n'
+        f'Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n'
+    ).encode('latin-1')
+
+
+def unsatisfiable_response(size):
+    response = Response(status=416)
+    response.headers['Content-Range'] = f'bytes */{size}'
+    return response
+
+
+def single_range_response(path, mimetype, start, stop, size):
+    def generate():
+        with open(path, 'rb') as f:
+            yield from _read_range(f, start, stop)
+
+    response = Response(generate(), 206, mimetype=mimetype, direct_passthrough=True)
+    response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    response.content_length = stop - start
+    return response
+
+
+def multipart_range_response(path, mimetype, ranges, size):
+    boundary = secrets.token_hex(16)
+    headers = [_part_header(boundary, mimetype, start, stop, size) for start, stop in ranges]
+    closing = f'--{boundary}--\r\n'.encode('latin-1')
+
+    def generate():
+        with open(path, 'rb') as f:
+            for header, (start, stop) in zip(headers, ranges):
+                yield header
+                yield from _read_range(f, start, stop)
+                yield b'\r\n'
+        yield closing
+
+    response = Response(generate(), 206, mimetype=f'multipart/byteranges; boundary={boundary}',
+                        direct_passthrough=True)
+    response.content_length = sum(len(header) + stop - start + 2
+                                  for header, (start, stop) in zip(headers, ranges)) + len(closing)
+    return response
+
+
+def range_response(path, mimetype, ranges, size):
+    if len(ranges) > MAX_RANGES:
+        ranges = [(0, None)]
+
+    ranges = normalize_ranges(ranges, size)
+    if not ranges:
+        return unsatisfiable_response(size)
+    if len(ranges) == 1:
+        return single_range_response(path, mimetype, ranges[0][0], ranges[0][1], size)
+    return multipart_range_response(path, mimetype, ranges, size)
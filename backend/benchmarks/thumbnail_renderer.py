@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.image_processor import THUMBNAIL_SIZES, render_thumbnail, render_thumbnails, thumbnail_path, save_image
+
+
+SOURCE_SIZE = (6000, 4000)
+ROUNDS = 5
+
+
+def make_source(path):
+    noise = Image.effect_noise(SOURCE_SIZE, 64).convert('RGB')
+    gradient = Image.linear_gradient('L').resize(SOURCE_SIZE).convert('RGB')
+    Image.blend(noise, gradient, 0.5).save(path, 'JPEG', quality=92)
+
+
+def full_decode(source, output_dir):
+    # The original renderer: a full-resolution decode for every size. Kept here as the baseline.
+    os.makedirs(output_dir, exist_ok=True)
+    for size in THUMBNAIL_SIZES:
+        with Image.open(source) as img:
+            img = img.convert('RGB')
+            img.thumbnail(THUMBNAIL_SIZES[size], Image.Resampling.LANCZOS)
+            save_image(img, thumbnail_path(output_dir, source, size, 85), 'jpeg', 85)
+
+
+def per_size(source, output_dir):
+    for size in THUMBNAIL_SIZES:
+        render_thumbnail(source, output_dir, size, 85)
+
+
+def cascaded(source, output_dir):
+    render_thumbnails(source, output_dir, 85)
+
+
+def measure(args):
+    name, source, output_dir = args
+    renderer = {'full-decode': full_decode, 'per-size': per_size, 'cascaded': cascaded}[name]
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        renderer(source, output_dir)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return name, elapsed, peak_rss_mb
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source.jpg')
+        ctx = multiprocessing.get_context('spawn')
+
+        # Build the source in a child so its buffers do not inflate the
+        # inherited peak RSS of the measuring processes.
+        with ctx.Pool(1) as pool:
+            pool.apply(make_source, (source,))
+
+        print(f"Source: {SOURCE_SIZE[0]}x{SOURCE_SIZE[1]} JPEG, {os.path.getsize(source) / 1048576:.1f} MB")
+        print(f"{'renderer':<12} {'wall (s)':>10} {'peak RSS (MB)':>14}")
+
+        for name in ['full-decode', 'per-size', 'cascaded']:
+            with ctx.Pool(1, maxtasksperchild=1) as pool:
+                name, elapsed, peak_rss_mb = pool.apply(measure, ((name, source, os.path.join(tmp, name)),))
+            print(f"{name:<12} {elapsed:>10.3f} {peak_rss_mb:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
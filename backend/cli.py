@@ -1,6 +1,13 @@
 import sys
+import time
 from app import create_app, bcrypt
-from app.models import db, Admin
+from app.models import db, Admin, Gallery, Image
+from app.services.derivatives import enqueue_derivatives, run_derivative_worker
+from app.services.gallery_counters import recompute_counters
+from app.services.audit_archive import archive_logs
+from app.services.zip_jobs import run_zip_worker
+from app.services.janitor import run_cleanup
+from app.services.image_order import rebalance_gallery, rebalance_pending
 
 
 def create_admin(username, email, password):
@@ -28,11 +35,80 @@ def create_admin(username, email, password):
         print(f"ID: {admin.id}")
 
 
+def derive_worker(processes=None):
+    app = create_app()
+    with app.app_context():
+        print(f"Starting derivative worker with {processes or app.config['DERIVATIVE_WORKER_PROCESSES']} processes")
+        run_derivative_worker(processes)
+
+
+def zip_worker(concurrency=None):
+    app = create_app()
+    with app.app_context():
+        print(f"Starting ZIP worker with {concurrency or app.config['ZIP_WORKER_CONCURRENCY']} concurrent builds")
+        run_zip_worker(concurrency)
+
+
+def requeue_derivatives():
+    app = create_app()
+    with app.app_context():
+        images = Image.query.filter((Image.derivative_status != 'ready') | Image.preview.is_(None)).all()
+        for image in images:
+            enqueue_derivatives(image)
+
+        print(f"Queued derivatives for {len(images)} images")
+
+
+def repair_counters():
+    app = create_app()
+    with app.app_context():
+        repaired = recompute_counters()
+        print(f"Repaired counters for {repaired} galleries")
+
+
+def rebalance_orders():
+    app = create_app()
+    with app.app_context():
+        gallery_ids = [gallery_id for gallery_id, in db.session.query(Gallery.id)]
+        for gallery_id in gallery_ids:
+            rebalance_gallery(gallery_id)
+
+        print(f"Rebalanced image order in {len(gallery_ids)} galleries")
+
+
+def archive_audit_logs(days=None):
+    app = create_app()
+    with app.app_context():
+        days = days if days is not None else app.config['AUDIT_LOG_RETENTION_DAYS']
+        archived = archive_logs(days)
+        print(f"Archived {archived} audit log entries older than {days} days to {app.config['AUDIT_ARCHIVE_PATH']}")
+
+
+def janitor(interval=None):
+    app = create_app()
+    with app.app_context():
+        while True:
+            removed = run_cleanup()
+            print(', '.join(f"{category}: freed {freed} bytes" for category, freed in removed.items()))
+            print(f"Rebalanced image order in {rebalance_pending()} galleries")
+            db.session.remove()
+            if not interval:
+                return
+            time.sleep(interval)
+
+
 if __name__ == '__main__':
     if len(sys.argv) < 2:
         print("Usage: python cli.py <command> [args]")
         print("Commands:")
         print("  create-admin <username> <email> <password>")
+        print("  derive-worker [processes]")
+        print("  zip-worker [concurrency]")
+        print("  requeue-derivatives")
+        print("  repair-counters")
+        print("  rebalance-orders")
+        print("  archive-audit-logs [days]")
+        print("  janitor [interval_seconds]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -42,6 +118,20 @@ if __name__ == '__main__':
             print("Usage: python cli.py create-admin <username> <email> <password>")
             sys.exit(1)
         create_admin(sys.argv[2], sys.argv[3], sys.argv[4])
+    elif command == 'derive-worker':
+        derive_worker(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    elif command == 'zip-worker':
+        zip_worker(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    elif command == 'requeue-derivatives':
+        requeue_derivatives()
+    elif command == 'repair-counters':
+        repair_counters()
+    elif command == 'rebalance-orders':
+        rebalance_orders()
+    elif command == 'janitor':
+        janitor(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    elif command == 'archive-audit-logs':
+        archive_audit_logs(int(sys.argv[2]) if len(sys.argv) > 2 else None)
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
@@ -16,3 +16,8 @@ max_requests = 1000
 max_requests_jitter = 50
 
 preload_app = True
+
+
+def worker_exit(server, worker):
+    from app.services.audit_logger import flush_pending
+    flush_pending()
@@ -0,0 +1,68 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+from app.models import db, Admin, AuditLog
+from app.services.audit_archive import archive_logs, archive_path, continue_into_archive
+from app.services.audit_search import filtered_query, log_page, parse_cursor
+
+
+@pytest.fixture
+def logs(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['AUDIT_ARCHIVE_PATH'] = str(tmp_path)
+    app.config['AUDIT_ARCHIVE_BATCH_SIZE'] = 2
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Admin(username='admin', email='admin@example.com', password_hash='x'))
+        recent = datetime.utcnow() - timedelta(days=1)
+        created = [datetime(2024, 1, 10), datetime(2024, 1, 20), datetime(2024, 2, 5), datetime(2024, 2, 5),
+                   recent, recent + timedelta(seconds=1)]
+        for index, created_at in enumerate(created):
+            db.session.add(AuditLog(admin_id=1, action='delete' if index == 1 else 'upload',
+                                    resource_type='image', resource_id=index, created_at=created_at))
+        db.session.commit()
+        yield
+
+
+def _page(limit, filters=None, cursor=None):
+    query = filtered_query(filters or {})
+    records, next_cursor = log_page(query, limit, cursor)
+    if next_cursor is None:
+        records, next_cursor = continue_into_archive(records, limit, filters or {}, cursor=cursor)
+    return [record['id'] for record in records], next_cursor and parse_cursor(next_cursor)
+
+
+def test_archives_old_entries_to_monthly_gzip(logs):
+    assert archive_logs(30) == 4
+    assert [log.id for log in AuditLog.query.order_by(AuditLog.id)] == [5, 6]
+
+    with gzip.open(archive_path('2024-02'), 'rt', encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == [3, 4]
+    with gzip.open(archive_path('2024-01'), 'rt', encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == [1, 2]
+
+
+def test_paging_spans_live_table_and_archive(logs):
+    archive_logs(30)
+
+    ids, cursor = _page(3)
+    assert ids == [6, 5, 4]
+    ids, cursor = _page(3, cursor=cursor)
+    assert ids == [3, 2, 1] and cursor is None
+
+    assert _page(10, filters={'action': 'upload'}) == ([6, 5, 4, 3, 1], None)
+
+
+def test_reading_archive_skips_entries_archived_twice(logs):
+    archive_logs(30)
+    with gzip.open(archive_path('2024-01'), 'rb') as f:
+        batch = f.read()
+    with gzip.open(archive_path('2024-01'), 'ab') as f:
+        f.write(batch)
+
+    assert _page(10) == ([6, 5, 4, 3, 2, 1], None)
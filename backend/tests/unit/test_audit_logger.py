@@ -0,0 +1,62 @@
+import time
+import pytest
+from flask import Flask
+from app.models import db, Admin, AuditLog
+from app.services import audit_logger
+from app.services.audit_logger import log_action, flush_pending
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(audit_logger, '_buffer', [])
+    monkeypatch.setattr(audit_logger, '_app', None)
+    monkeypatch.setattr(audit_logger, '_flusher_pid', None)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['AUDIT_LOG_SYNC'] = False
+    app.config['AUDIT_LOG_FLUSH_SIZE'] = 3
+    app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 3600
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Admin(username='admin', email='admin@example.com', password_hash='x'))
+        db.session.commit()
+        yield app
+
+
+def _log(count):
+    for index in range(count):
+        log_action(1, 'upload', 'image', index)
+
+
+def test_flushes_when_buffer_reaches_size(app):
+    _log(2)
+    assert AuditLog.query.count() == 0
+
+    _log(1)
+    assert AuditLog.query.count() == 3
+    assert audit_logger._buffer == []
+
+
+def test_flush_pending_writes_remainder_at_shutdown(app):
+    _log(2)
+    assert AuditLog.query.count() == 0
+
+    # atexit runs flush_pending when the worker shuts down.
+    assert flush_pending() == 2
+    assert [log.resource_id for log in AuditLog.query.order_by(AuditLog.id)] == [0, 1]
+    assert flush_pending() == 0
+
+
+def test_flushes_on_interval(app):
+    app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 0.05
+    _log(1)
+
+    deadline = time.monotonic() + 5
+    while not AuditLog.query.count() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert AuditLog.query.count() == 1
+    assert audit_logger._buffer == []
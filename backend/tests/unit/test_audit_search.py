@@ -0,0 +1,52 @@
+from datetime import datetime
+import pytest
+from flask import Flask
+from app.models import db, Admin, AuditLog
+from app.services.audit_search import filtered_query, log_page, parse_cursor
+
+
+@pytest.fixture
+def logs():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Admin(username=name, email=f'{name}@example.com', password_hash='x')
+                            for name in ('alice', 'bob')])
+        same_second = datetime(2024, 5, 1, 12, 0, 0)
+        for index in range(6):
+            db.session.add(AuditLog(admin_id=1 + index % 2, action='upload' if index < 4 else 'delete',
+                                    resource_type='image', resource_id=index, created_at=same_second))
+        db.session.add(AuditLog(admin_id=1, action='upload', resource_type='image',
+                                created_at=datetime(2024, 4, 30)))
+        db.session.commit()
+        yield
+
+
+def _pages(query, limit):
+    pages, cursor = [], None
+    while True:
+        records, next_cursor = log_page(query, limit, cursor)
+        pages.append([record['id'] for record in records])
+        if next_cursor is None:
+            return pages
+        cursor = parse_cursor(next_cursor)
+
+
+def test_pages_across_equal_timestamps_by_id(logs):
+    assert _pages(filtered_query({}), 4) == [[6, 5, 4, 3], [2, 1, 7]]
+    assert _pages(filtered_query({}), 2) == [[6, 5], [4, 3], [2, 1], [7]]
+
+
+def test_filters_apply_alongside_cursor(logs):
+    query = filtered_query({'admin_id': 1, 'action': 'upload'})
+    assert _pages(query, 1) == [[3], [1], [7]]
+
+    query = filtered_query({'action': 'upload'}, until=datetime(2024, 5, 1, 12))
+    assert _pages(query, 1) == [[7]]
+
+
+def test_parse_cursor_rejects_garbage():
+    assert parse_cursor('not-a-cursor') is None
@@ -0,0 +1,93 @@
+import io
+import os
+import pytest
+from flask import Flask
+from PIL import Image as PILImage
+from app.models import db, Admin, Blob, Gallery
+from app.services import image_batch, image_ingest
+from app.services.blob_store import (
+    blob_path, stream_to_temp, commit_blob, add_reference, release_references, purge_unreferenced
+)
+from app.services.image_batch import delete_images
+from app.services.image_ingest import store_image
+
+
+def _jpeg(color):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (40, 30), color).save(buffer, 'JPEG')
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def gallery(tmp_path, monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    for name in ('BLOB_STORE_PATH', 'DERIVATIVE_PATH', 'TEMP_UPLOAD_PATH', 'GALLERY_DATA_PATH'):
+        app.config[name] = str(tmp_path / name.lower())
+        os.makedirs(app.config[name])
+    db.init_app(app)
+
+    for module in (image_ingest, image_batch):
+        monkeypatch.setattr(module, 'invalidate', lambda **kwargs: None)
+    monkeypatch.setattr(image_ingest, 'enqueue_derivatives', lambda image: None)
+
+    with app.app_context():
+        db.create_all()
+        admin = Admin(username='admin', email='admin@example.com', password_hash='x')
+        gallery = Gallery(name='Blobs', slug='blobs', owner=admin)
+        db.session.add(gallery)
+        db.session.commit()
+        yield gallery
+
+
+def _upload(gallery, color=(200, 10, 10)):
+    temp_path, sha256, _ = stream_to_temp(_jpeg(color))
+    commit_blob(temp_path, sha256)
+    return store_image(gallery, sha256, 'photo.jpg', gallery.owner_id)
+
+
+def test_duplicate_uploads_share_one_blob(gallery):
+    first = _upload(gallery)
+    second = _upload(gallery)
+
+    assert first.file_path == second.file_path == blob_path(first.sha256)
+    assert db.session.get(Blob, first.sha256).ref_count == 2
+    assert len(os.listdir(os.path.dirname(first.file_path))) == 1
+
+
+def test_deleting_images_purges_at_zero(gallery):
+    first, second, other = _upload(gallery), _upload(gallery), _upload(gallery, (10, 10, 200))
+    shared, path = first.sha256, first.file_path
+    blobs = {shared: path, other.sha256: other.file_path}
+
+    assert delete_images(gallery, [first.id]) == 1
+    assert db.session.get(Blob, shared).ref_count == 1
+    assert os.path.exists(path)
+
+    assert delete_images(gallery, [second.id, other.id]) == 2
+    for sha256, path in blobs.items():
+        assert db.session.get(Blob, sha256) is None
+        assert not os.path.exists(path)
+
+
+def test_gallery_release_purges_every_reference(gallery):
+    image = _upload(gallery)
+    _upload(gallery)
+
+    release_references({image.sha256: 2})
+    db.session.commit()
+
+    assert purge_unreferenced([image.sha256]) == 1
+    assert not os.path.exists(image.file_path)
+
+
+def test_purge_skips_blob_referenced_after_release(gallery):
+    image = _upload(gallery)
+    release_references({image.sha256: 1})
+    add_reference(image.sha256)
+    db.session.commit()
+
+    assert purge_unreferenced([image.sha256]) == 0
+    assert db.session.get(Blob, image.sha256).ref_count == 1
+    assert os.path.exists(image.file_path)
@@ -0,0 +1,26 @@
+import io
+import zipfile
+from flask import Flask
+from app.services.bulk_ingest import is_archive, archive_members
+
+
+def test_is_archive():
+    assert is_archive('shoot.ZIP') and is_archive('shoot.tar.gz') and is_archive('shoot.tgz')
+    assert not is_archive('photo.jpg')
+
+
+def test_archive_members_skip_non_images():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('shoot/a.jpg', b'a')
+        archive.writestr('shoot/notes.txt', b'notes')
+        archive.writestr('__MACOSX/shoot/._a.jpg', b'fork')
+        archive.writestr('shoot/.hidden.png', b'hidden')
+    buffer.seek(0)
+
+    app = Flask(__name__)
+    app.config['ALLOWED_EXTENSIONS'] = {'jpg', 'png'}
+    with app.app_context():
+        members = [(name, member.read()) for name, member in archive_members(buffer, 'shoot.zip')]
+
+    assert members == [('shoot/a.jpg', b'a')]
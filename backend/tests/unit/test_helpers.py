@@ -1,5 +1,5 @@
 import pytest
-from app.utils.helpers import slugify, format_file_size
+from app.utils.helpers import slugify, format_file_size, encode_cursor, decode_cursor
 
 
 def test_slugify():
@@ -13,3 +13,15 @@ def test_format_file_size():
     assert format_file_size(1024) == '1.00 KB'
     assert format_file_size(1048576) == '1.00 MB'
     assert format_file_size(1073741824) == '1.00 GB'
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([42, 1337])
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 2) == [42, 1337]
+
+
+def test_decode_cursor_rejects_malformed():
+    assert decode_cursor('not-a-cursor!', 2) is None
+    assert decode_cursor(encode_cursor([1, 2, 3]), 2) is None
+    assert decode_cursor(encode_cursor({'order': 1}), 2) is None
@@ -0,0 +1,29 @@
+from datetime import datetime
+from types import SimpleNamespace
+from app.utils.http_cache import image_version, image_etag
+
+
+def _image():
+    return SimpleNamespace(id=7, file_size=1024, uploaded_at=datetime(2025, 1, 1))
+
+
+def _gallery(**overrides):
+    values = dict(name='Wedding', thumbnail_quality=85, watermark_enabled=False,
+                  watermark_text=None, watermark_opacity=30)
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_image_version_tracks_rendering_settings():
+    base = image_version(_image(), _gallery())
+    assert base == image_version(_image(), _gallery())
+    assert base != image_version(_image(), _gallery(thumbnail_quality=70))
+    assert base != image_version(_image(), _gallery(watermark_enabled=True))
+
+
+def test_image_version_ignores_watermark_settings_when_disabled():
+    assert image_version(_image(), _gallery()) == image_version(_image(), _gallery(watermark_opacity=80))
+
+
+def test_image_etag():
+    assert image_etag('abc', 'small', 'webp') == 'abc-small-webp'
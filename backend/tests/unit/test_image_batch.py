@@ -0,0 +1,13 @@
+from app.services.image_batch import parse_image_ids
+
+
+def test_parse_image_ids_accepts_unique_ints():
+    assert parse_image_ids({'image_ids': [3, 1, 2]}) == [3, 1, 2]
+
+
+def test_parse_image_ids_rejects_invalid_lists():
+    assert parse_image_ids({}) is None
+    assert parse_image_ids({'image_ids': []}) is None
+    assert parse_image_ids({'image_ids': [1, 1]}) is None
+    assert parse_image_ids({'image_ids': [1, '2']}) is None
+    assert parse_image_ids({'image_ids': [True]}) is None
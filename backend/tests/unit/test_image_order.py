@@ -0,0 +1,87 @@
+import pytest
+from flask import Flask
+from app.models import db, Admin, Gallery, Image
+from app.services import image_order
+from app.services.image_order import ORDER_GAP, move_image
+
+
+@pytest.fixture
+def gallery(monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+
+    rebalances = []
+    monkeypatch.setattr(image_order, 'invalidate', lambda **kwargs: None)
+    monkeypatch.setattr(image_order, 'request_rebalance', rebalances.append)
+
+    with app.app_context():
+        db.create_all()
+        admin = Admin(username='admin', email='admin@example.com', password_hash='x')
+        gallery = Gallery(name='Order', slug='order', owner=admin)
+        db.session.add(gallery)
+        db.session.flush()
+        for position in range(1, 5):
+            db.session.add(Image(gallery_id=gallery.id, filename=f'{position}.jpg', original_filename=f'{position}.jpg',
+                                 file_size=1, width=1, height=1, file_path=f'/{position}.jpg',
+                                 order=position * ORDER_GAP, uploaded_by=admin.id))
+        db.session.commit()
+        gallery.rebalances = rebalances
+        yield gallery
+
+
+def _ordered(gallery):
+    return [image.id for image in Image.query.filter_by(gallery_id=gallery.id).order_by(Image.order, Image.id)]
+
+
+def test_move_to_start_and_end(gallery):
+    first, second, third, fourth = _ordered(gallery)
+
+    assert move_image(db.session.get(Image, third), None) == 0
+    assert _ordered(gallery) == [third, first, second, fourth]
+
+    assert move_image(db.session.get(Image, first), db.session.get(Image, fourth)) == 5 * ORDER_GAP
+    assert _ordered(gallery) == [third, second, fourth, first]
+    assert gallery.rebalances == []
+
+
+def test_move_between_neighbours_writes_one_row(gallery):
+    first, second, third, fourth = _ordered(gallery)
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE images'):
+            updates.append(cursor.rowcount)
+
+    db.event.listen(db.engine, 'after_cursor_execute', record)
+    try:
+        order = move_image(db.session.get(Image, fourth), db.session.get(Image, first))
+    finally:
+        db.event.remove(db.engine, 'after_cursor_execute', record)
+
+    assert order == ORDER_GAP + ORDER_GAP // 2
+    assert updates == [1]
+    assert _ordered(gallery) == [first, fourth, second, third]
+
+
+def test_move_without_gap_rebalances_first(gallery):
+    first, second, third, fourth = _ordered(gallery)
+    db.session.get(Image, second).order = ORDER_GAP + 1
+    db.session.commit()
+
+    move_image(db.session.get(Image, fourth), db.session.get(Image, first))
+
+    assert _ordered(gallery) == [first, fourth, second, third]
+    orders = [db.session.get(Image, image_id).order for image_id in _ordered(gallery)]
+    assert orders == [ORDER_GAP, ORDER_GAP + ORDER_GAP // 2, 2 * ORDER_GAP, 3 * ORDER_GAP]
+
+
+def test_crowded_move_requests_rebalance(gallery):
+    first, second, third, fourth = _ordered(gallery)
+    db.session.get(Image, second).order = ORDER_GAP + 10
+    db.session.commit()
+
+    move_image(db.session.get(Image, fourth), db.session.get(Image, first))
+
+    assert db.session.get(Image, fourth).order == ORDER_GAP + 5
+    assert gallery.rebalances == [gallery.id]
@@ -0,0 +1,64 @@
+from PIL import Image
+from werkzeug.datastructures import MIMEAccept
+from app.services.image_processor import (
+    THUMBNAIL_SIZES, negotiate_format, placeholder_dimensions, render_thumbnails, image_preview,
+    derivative_exists, derivative_manifest, generate_thumbnail, thumbnail_path
+)
+
+
+def test_placeholder_dimensions():
+    assert placeholder_dimensions(1600, 1200, 'small') == (200, 150)
+    assert placeholder_dimensions(1200, 1600, 'large') == (600, 800)
+    assert placeholder_dimensions(100, 50, 'medium') == (100, 50)
+
+
+def test_render_thumbnails_cascades_all_sizes(tmp_path):
+    source = tmp_path / 'source.jpg'
+    Image.new('RGB', (3000, 1500), (120, 60, 30)).save(source, 'JPEG')
+
+    paths = render_thumbnails(str(source), str(tmp_path / 'thumbnails'), quality=80, formats=('webp', 'jpeg'))
+
+    assert set(paths) == set(THUMBNAIL_SIZES)
+    for size, variants in paths.items():
+        assert set(variants) == {'webp', 'jpeg'}
+        with Image.open(variants['webp']) as thumb:
+            assert thumb.size == (THUMBNAIL_SIZES[size][0], THUMBNAIL_SIZES[size][0] // 2)
+    assert not list((tmp_path / 'thumbnails').glob('*.part'))
+
+
+def test_negotiate_format_requires_explicit_accept():
+    assert negotiate_format(MIMEAccept([('image/webp', 1), ('*/*', 0.8)])) == 'webp'
+    assert negotiate_format(MIMEAccept([('*/*', 1)])) == 'jpeg'
+    assert negotiate_format(MIMEAccept([('image/webp', 0), ('image/jpeg', 1)])) == 'jpeg'
+
+
+def test_image_preview_is_tiny_data_uri(tmp_path):
+    source = tmp_path / 'source.jpg'
+    Image.new('RGB', (400, 300), (200, 30, 30)).save(source)
+
+    preview, dominant_color = image_preview(str(source))
+
+    assert preview.startswith('data:image/')
+    assert len(preview) < 1000
+    assert dominant_color.startswith('#') and len(dominant_color) == 7
+    assert int(dominant_color[1:3], 16) > 150
+
+
+def test_generate_thumbnail_reuses_existing_file(tmp_path):
+    source = tmp_path / 'source.jpg'
+    Image.new('RGB', (600, 400), (10, 20, 30)).save(source, 'JPEG')
+    output_dir = str(tmp_path / 'thumbnails')
+    path = thumbnail_path(output_dir, str(source), 'small', 80, 'jpeg')
+
+    assert not derivative_exists(path)
+    assert generate_thumbnail(str(source), output_dir, 'small', 80, 'jpeg') == path
+    mtime = (tmp_path / 'thumbnails' / 'source_small_q80.jpg').stat().st_mtime_ns
+    assert generate_thumbnail(str(source), output_dir, 'small', 80, 'jpeg') == path
+    assert (tmp_path / 'thumbnails' / 'source_small_q80.jpg').stat().st_mtime_ns == mtime
+    assert derivative_exists(path)
+
+
+def test_derivative_manifest_lists_every_variant():
+    manifest = derivative_manifest(85, ('webp', 'jpeg'))
+    assert len(manifest) == len(THUMBNAIL_SIZES) * 2
+    assert 'small:85:webp' in manifest
@@ -0,0 +1,30 @@
+from flask import Flask
+from app.services.janitor import _evictions, _stale_partials
+
+
+def test_evictions_remove_least_recently_used_until_within_budget():
+    files = [('a', 40, 300), ('b', 40, 100), ('c', 40, 200), ('d', 40, 400)]
+
+    assert _evictions(files, [], 100) == [('b', 40, 100), ('c', 40, 200)]
+
+
+def test_evictions_skip_orphans_and_unbudgeted():
+    files = [('a', 40, 300), ('b', 40, 100), ('c', 40, 200)]
+
+    assert _evictions(files, [('b', 40, 100)], 50) == [('c', 40, 200)]
+    assert _evictions(files, [], None) == []
+
+
+def test_evictions_never_take_partial_builds():
+    files = [('1-all-abc.zip', 40, 300), ('1-all-def.zip.1a2b.part', 40, 100)]
+
+    assert _evictions(files, [], 10) == [('1-all-abc.zip', 40, 300)]
+
+
+def test_stale_partials_wait_for_orphan_age():
+    app = Flask(__name__)
+    app.config['ARTIFACT_ORPHAN_AGE'] = 100
+    files = [('a.webp', 40, 0), ('a.webp.1a2b.part', 40, 0), ('b.webp.3c4d.part', 40, 950)]
+
+    with app.app_context():
+        assert _stale_partials(files, 1000) == [('a.webp.1a2b.part', 40, 0)]
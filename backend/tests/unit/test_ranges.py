@@ -0,0 +1,24 @@
+from app.utils.ranges import parse_ranges, normalize_ranges
+
+
+def test_normalize_ranges_resolves_open_and_suffix_ranges():
+    assert normalize_ranges([(0, 10), (90, None)], 100) == [(0, 10), (90, 100)]
+    assert normalize_ranges([(-5, None)], 100) == [(95, 100)]
+    assert normalize_ranges([(-500, None)], 100) == [(0, 100)]
+
+
+def test_normalize_ranges_merges_overlapping_and_adjacent():
+    assert normalize_ranges([(50, 60), (0, 10), (5, 20), (20, 30)], 100) == [(0, 30), (50, 60)]
+
+
+def test_normalize_ranges_drops_unsatisfiable():
+    assert normalize_ranges([(100, None), (150, 200)], 100) == []
+    assert normalize_ranges([(90, 200)], 100) == [(90, 100)]
+
+
+def test_parse_ranges():
+    assert parse_ranges('bytes=0-9,5-20,-4,100-') == [(0, 10), (5, 21), (-4, None), (100, None)]
+    assert parse_ranges('bytes=-0') == []
+    assert parse_ranges('bytes=9-2') is None
+    assert parse_ranges('bytes=a-b') is None
+    assert parse_ranges('items=0-9') is None
@@ -0,0 +1,16 @@
+from app.services.responsive import srcset_widths, srcset
+
+
+LADDER = (320, 640, 960, 1280)
+
+
+def test_srcset_widths_stop_at_original():
+    assert srcset_widths(800, LADDER) == [320, 640, 960]
+    assert srcset_widths(640, LADDER) == [320, 640]
+    assert srcset_widths(5000, LADDER) == list(LADDER)
+    assert srcset_widths(100, LADDER) == [320]
+
+
+def test_srcset_never_claims_upscaled_width():
+    value = srcset(1, 2, 800, 'abc', LADDER)
+    assert value.split(', ')[-1] == '/images/w/1/2/960?v=abc 800w'
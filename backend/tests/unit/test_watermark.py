@@ -0,0 +1,19 @@
+from PIL import Image
+from app.services.watermark import watermark_image, text_overlay, font_size_bucket
+
+
+def test_font_size_bucket_groups_similar_widths():
+    assert font_size_bucket(300) == 20
+    assert font_size_bucket(1200) == font_size_bucket(1230) == 40
+
+
+def test_watermark_only_touches_text_region():
+    source = Image.new('RGB', (1200, 800), (10, 10, 10))
+    result = watermark_image(source, 'Sample', 50)
+    tile = text_overlay('Sample', 50, font_size_bucket(1200))
+
+    assert result.size == source.size
+    assert result.getpixel((0, 0)) == (10, 10, 10)
+    region = result.crop((1200 - 20 - tile.width, 800 - 20 - tile.height, 1200 - 20, 800 - 20))
+    assert region.getextrema()[0][1] > 10
+    assert text_overlay('Sample', 50, font_size_bucket(1200)) is tile
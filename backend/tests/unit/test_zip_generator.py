@@ -0,0 +1,49 @@
+import io
+import zipfile
+import zlib
+from collections import namedtuple
+from datetime import datetime
+from flask import Flask
+from stream_zip import stream_zip
+from app.services.zip_generator import archive_fingerprint, zip_members, zip_size
+
+
+Entry = namedtuple('Entry', 'original_filename uploaded_at file_path file_size crc32')
+
+
+def _entry(tmp_path, name, data, crc=True):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return Entry(name, datetime(2024, 5, 1), str(path), len(data), zlib.crc32(data) if crc else None)
+
+
+def test_zip_size_matches_stored_archive(tmp_path):
+    entries = [_entry(tmp_path, 'a.jpg', b'x' * 70000), _entry(tmp_path, 'b.png', b'y' * 123)]
+    archive = b''.join(stream_zip(zip_members(entries)))
+
+    assert zip_size(entries) == len(archive)
+    with zipfile.ZipFile(io.BytesIO(archive)) as z:
+        assert [info.compress_type for info in z.infolist()] == [zipfile.ZIP_STORED] * 2
+        assert z.read('a.jpg') == b'x' * 70000
+
+
+def test_zip_size_unknown_without_crc(tmp_path):
+    entries = [_entry(tmp_path, 'a.jpg', b'x' * 10), _entry(tmp_path, 'b.jpg', b'y' * 10, crc=False)]
+
+    assert zip_size(entries) is None
+    with zipfile.ZipFile(io.BytesIO(b''.join(stream_zip(zip_members(entries))))) as z:
+        assert z.testzip() is None
+
+
+FingerprintEntry = namedtuple('FingerprintEntry', 'id order is_hidden sha256 original_filename')
+
+
+def test_fingerprint_ignores_rebalanced_orders():
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    crowded = [FingerprintEntry(1, 1024, False, 'a' * 64, 'a.jpg'), FingerprintEntry(2, 1025, False, 'b' * 64, 'b.jpg')]
+    rebalanced = [entry._replace(order=position * 1024) for position, entry in enumerate(crowded, start=1)]
+
+    with app.app_context():
+        assert archive_fingerprint(crowded) == archive_fingerprint(rebalanced)
+        assert archive_fingerprint(crowded) != archive_fingerprint(crowded[::-1])
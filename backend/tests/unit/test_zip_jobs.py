@@ -0,0 +1,119 @@
+import os
+import time
+import zipfile
+import fakeredis
+import pytest
+from flask import Flask, current_app
+from app.models import db, Admin, Gallery, Image
+from app.services import zip_jobs
+from app.services.zip_jobs import build_zip, get_task, request_zip_build, task_progress
+from app.services.zip_generator import zip_entries
+
+
+@pytest.fixture
+def gallery(tmp_path, monkeypatch):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///:memory:', SECRET_KEY='test', ZIP_QUEUE_LIMIT=10,
+                      ZIP_ABANDON_TIMEOUT=60, ZIP_OUTPUT_PATH=str(tmp_path / 'zips'), REDIS_URL='redis://fake')
+    os.makedirs(app.config['ZIP_OUTPUT_PATH'])
+    db.init_app(app)
+
+    redis_client = fakeredis.FakeRedis()
+    queued = []
+    monkeypatch.setattr(zip_jobs, '_redis', lambda: redis_client)
+    monkeypatch.setattr(zip_jobs, 'enqueue_job', lambda url, queue, job: queued.append(job))
+
+    with app.app_context():
+        db.create_all()
+        admin = Admin(username='admin', email='admin@example.com', password_hash='x')
+        gallery = Gallery(name='Zips', slug='zips', owner=admin)
+        db.session.add(gallery)
+        db.session.flush()
+        for index in range(3):
+            path = tmp_path / f'{index}.jpg'
+            path.write_bytes(bytes([index]) * 1000)
+            db.session.add(Image(gallery_id=gallery.id, filename=path.name, original_filename=path.name,
+                                 file_size=1000, width=1, height=1, file_path=str(path),
+                                 order=index, uploaded_by=admin.id))
+        db.session.commit()
+
+        gallery.redis, gallery.queued = redis_client, queued
+        yield gallery
+
+
+def _updates(monkeypatch):
+    updates = []
+    update_task = zip_jobs.update_task
+
+    def record(redis_client, task_id, **fields):
+        updates.append(fields)
+        update_task(redis_client, task_id, **fields)
+
+    monkeypatch.setattr(zip_jobs, 'update_task', record)
+    return updates
+
+
+def test_build_moves_from_queued_to_ready(gallery, monkeypatch):
+    task = request_zip_build(gallery, zip_entries(gallery), 'visible')
+    assert task['status'] == 'queued' and task['images_total'] == 3 and task['images_done'] == 0
+    assert gallery.queued == [{'task_id': task['task_id']}]
+
+    updates = _updates(monkeypatch)
+    build_zip(gallery.redis, task['task_id'])
+
+    task = get_task(gallery.redis, task['task_id'])
+    assert [fields['status'] for fields in updates if 'status' in fields] == ['processing', 'ready']
+    assert task_progress(task)['images_done'] == 3
+    path = os.path.join(current_app.config['ZIP_OUTPUT_PATH'], task['filename'])
+    assert task['bytes_written'] == os.path.getsize(path)
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ['0.jpg', '1.jpg', '2.jpg']
+
+    assert request_zip_build(gallery, zip_entries(gallery), 'visible')['status'] == 'ready'
+    assert len(gallery.queued) == 1
+
+
+def test_build_reports_progress(gallery, monkeypatch):
+    task = request_zip_build(gallery, zip_entries(gallery), 'visible')
+    monkeypatch.setattr(zip_jobs, 'PROGRESS_INTERVAL', 0)
+    updates = _updates(monkeypatch)
+
+    build_zip(gallery.redis, task['task_id'])
+
+    done = [fields['images_done'] for fields in updates if 'images_done' in fields]
+    written = [fields['bytes_written'] for fields in updates if 'bytes_written' in fields]
+    assert done == sorted(done) and done[0] < 3 and done[-1] == 3
+    assert written == sorted(written) and written[-1] == get_task(gallery.redis, task['task_id'])['bytes_written']
+
+
+def test_build_records_failure_and_removes_partial_file(gallery):
+    task = request_zip_build(gallery, zip_entries(gallery), 'visible')
+    os.remove(zip_entries(gallery)[1].file_path)
+
+    build_zip(gallery.redis, task['task_id'])
+
+    task = get_task(gallery.redis, task['task_id'])
+    assert task['status'] == 'error' and task['error']
+    assert os.listdir(current_app.config['ZIP_OUTPUT_PATH']) == []
+
+
+def test_build_rejects_gallery_changed_since_request(gallery):
+    task = request_zip_build(gallery, zip_entries(gallery), 'visible')
+    Image.query.filter_by(filename='2.jpg').update({Image.is_hidden: True})
+    db.session.commit()
+
+    build_zip(gallery.redis, task['task_id'])
+
+    assert get_task(gallery.redis, task['task_id'])['status'] == 'error'
+
+
+def test_build_stops_when_abandoned(gallery, monkeypatch):
+    task = request_zip_build(gallery, zip_entries(gallery), 'visible')
+    zip_jobs.update_task(gallery.redis, task['task_id'], polled_at=time.time() - 120)
+    monkeypatch.setattr(zip_jobs, 'PROGRESS_INTERVAL', 0)
+
+    build_zip(gallery.redis, task['task_id'])
+
+    task = get_task(gallery.redis, task['task_id'])
+    assert task['status'] == 'cancelled' and task['error'] == 'Abandoned'
+    assert os.listdir(current_app.config['ZIP_OUTPUT_PATH']) == []
@@ -305,7 +305,7 @@ const ImageCard = ({
   image, galleryId, isCover,
   onSetCover, onToggleVisibility, onDelete
 }) => {
-  const thumbUrl = `/images/thumbnails/${galleryId}/${image.id}?size=small`;
+  const thumbUrl = `/images/thumbnails/${galleryId}/${image.id}?size=small&v=${image.version}`;
 
   return (
     <Box sx={{
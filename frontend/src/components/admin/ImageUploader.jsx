@@ -3,6 +3,13 @@ import { Box, Typography, Paper, LinearProgress, List, ListItem, ListItemText, I
 import { CloudUpload, CheckCircle, Error, Delete } from '@mui/icons-material';
 import { imagesAPI } from '../../services/api';
 
+const ARCHIVE_PATTERN = /\.(zip|tar|tar\.gz|tgz)$/i;
+// Small images go up together in one request; large ones use resumable chunked uploads.
+const BULK_BATCH_SIZE = 25;
+const BULK_FILE_LIMIT = 10 * 1024 * 1024;
+
+const isArchive = (file) => ARCHIVE_PATTERN.test(file.name);
+
 const ImageUploader = ({ galleryId, onUploadComplete }) => {
   const [uploadQueue, setUploadQueue] = useState([]);
   const activeUploadsRef = useRef(0);
@@ -10,7 +17,7 @@ const ImageUploader = ({ galleryId, onUploadComplete }) => {
   const handleDrop = useCallback((e) => {
     e.preventDefault();
     const files = Array.from(e.dataTransfer.files).filter(file =>
-      file.type.startsWith('image/')
+      file.type.startsWith('image/') || isArchive(file)
     );
     uploadFiles(files);
   }, [galleryId]);
@@ -32,8 +39,17 @@ const ImageUploader = ({ galleryId, onUploadComplete }) => {
     setUploadQueue(prev => [...prev, ...newUploads]);
     activeUploadsRef.current += newUploads.length;
 
+    const batched = newUploads.filter(upload => !isArchive(upload.file) && upload.file.size <= BULK_FILE_LIMIT);
+    for (let i = 0; i < batched.length; i += BULK_BATCH_SIZE) {
+      uploadBatch(batched.slice(i, i + BULK_BATCH_SIZE));
+    }
+
     newUploads.forEach(upload => {
-      uploadFile(upload);
+      if (isArchive(upload.file)) {
+        uploadArchive(upload);
+      } else if (!batched.includes(upload)) {
+        uploadFile(upload);
+      }
     });
   };
 
@@ -71,6 +87,57 @@ const ImageUploader = ({ galleryId, onUploadComplete }) => {
     }
   };
 
+  const uploadBatch = async (batch) => {
+    batch.forEach(upload => updateUploadStatus(upload.id, { status: 'uploading', progress: 0 }));
+
+    try {
+      const { data } = await imagesAPI.bulkUpload(
+        galleryId,
+        batch.map(upload => upload.file),
+        (progressEvent) => {
+          const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
+          batch.forEach(upload => updateUploadStatus(upload.id, { progress }));
+        }
+      );
+      batch.forEach((upload, index) => {
+        const result = data.results[index];
+        updateUploadStatus(upload.id, result?.status === 'created'
+          ? { status: 'completed', progress: 100 }
+          : { status: 'error', error: result?.error || 'Upload failed' });
+      });
+    } catch (err) {
+      const results = err.response?.data?.results || [];
+      batch.forEach((upload, index) => updateUploadStatus(upload.id, {
+        status: 'error',
+        error: results[index]?.error || err.response?.data?.error || 'Upload failed'
+      }));
+    }
+    batch.forEach(() => onFileFinished());
+  };
+
+  const uploadArchive = async (upload) => {
+    updateUploadStatus(upload.id, { status: 'uploading', progress: 0 });
+
+    try {
+      const { data } = await imagesAPI.bulkUpload(galleryId, [upload.file], (progressEvent) => {
+        updateUploadStatus(upload.id, {
+          progress: Math.round((progressEvent.loaded * 100) / progressEvent.total)
+        });
+      });
+      updateUploadStatus(upload.id, {
+        status: 'completed',
+        progress: 100,
+        message: `${data.created} images added${data.failed ? `, ${data.failed} skipped` : ''}`
+      });
+    } catch (err) {
+      updateUploadStatus(upload.id, {
+        status: 'error',
+        error: err.response?.data?.results?.[0]?.error || err.response?.data?.error || 'Upload failed'
+      });
+    }
+    onFileFinished();
+  };
+
   const updateUploadStatus = (id, updates) => {
     setUploadQueue(prev => prev.map(item =>
       item.id === id ? { ...item, ...updates } : item
@@ -111,13 +178,13 @@ const ImageUploader = ({ galleryId, onUploadComplete }) => {
           Drop images here or click to browse
         </Typography>
         <Typography variant="body2" color="text.secondary">
-          Supports JPG, PNG, GIF, WebP
+          Supports JPG, PNG, GIF, WebP, and ZIP or tar archives of them
         </Typography>
         <input
           id="file-input"
           type="file"
           multiple
-          accept="image/*"
+          accept="image/*,.zip,.tar,.tgz,.gz"
           style={{ display: 'none' }}
           onChange={handleFileSelect}
         />
@@ -146,7 +213,7 @@ const ImageUploader = ({ galleryId, onUploadComplete }) => {
                       {upload.status === 'uploading' && (
                         <LinearProgress variant="determinate" value={upload.progress} sx={{ mt: 1 }} />
                       )}
-                      {upload.status === 'completed' && 'Upload complete'}
+                      {upload.status === 'completed' && (upload.message || 'Upload complete')}
                       {upload.status === 'queued' && 'Queued'}
                     </>
                   }
@@ -9,8 +9,11 @@ const ANIMATION_CONFIG = {
   glitch: { interval: 1500 },
 };
 
-const getImageUrl = (galleryId, imageId) => {
-  return `/images/thumbnails/${galleryId}/${imageId}?size=medium`;
+const HOVER_PREVIEW_LIMIT = 24;
+
+const getImageUrl = (galleryId, imageId, version) => {
+  const url = `/images/thumbnails/${galleryId}/${imageId}?size=medium`;
+  return version ? `${url}&v=${version}` : url;
 };
 
 const GalleryCard = ({ gallery }) => {
@@ -29,7 +32,7 @@ const GalleryCard = ({ gallery }) => {
   const fetchImages = useCallback(async () => {
     if (fetchedRef.current) return;
     fetchedRef.current = true;
-    const response = await galleriesAPI.getBySlug(gallery.slug);
+    const response = await galleriesAPI.getBySlug(gallery.slug, { limit: HOVER_PREVIEW_LIMIT, fields: 'id,version' });
     const imgs = response.data.images;
     if (imgs?.length > 0) {
       setImages(imgs);
@@ -131,7 +134,7 @@ const AnimatedImageStack = ({
           <Box
             key={img.id}
             component="img"
-            src={getImageUrl(galleryId, img.id)}
+            src={getImageUrl(galleryId, img.id, img.version)}
             alt=""
             sx={{
               position: 'absolute',
@@ -156,7 +159,7 @@ const AnimatedImageStack = ({
       <Box
         key={currentIndex}
         component="img"
-        src={getImageUrl(galleryId, img.id)}
+        src={getImageUrl(galleryId, img.id, img.version)}
         alt=""
         sx={{
           position: 'absolute',
@@ -176,7 +179,7 @@ const AnimatedImageStack = ({
 
   if (animationType === 'glitch') {
     const img = images[currentIndex];
-    const src = getImageUrl(galleryId, img.id);
+    const src = getImageUrl(galleryId, img.id, img.version);
     return (
       <Box sx={{ position: 'absolute', inset: 0 }}>
         <Box
@@ -15,8 +15,6 @@ const GalleryGrid = () => {
   const [requiresPassword, setRequiresPassword] = useState(false);
   const [selectedImage, setSelectedImage] = useState(null);
   const [selectedIndex, setSelectedIndex] = useState(0);
-  const [downloadStatus, setDownloadStatus] = useState(null);
-  const [downloadTaskId, setDownloadTaskId] = useState(null);
 
   useEffect(() => {
     loadGallery();
@@ -62,45 +60,6 @@ const GalleryGrid = () => {
     }
   };
 
-  const handleDownloadGallery = async () => {
-    setDownloadStatus('requesting');
-
-    try {
-      const response = await downloadsAPI.requestZip(slug);
-      const taskId = response.data.task_id;
-      setDownloadTaskId(taskId);
-      setDownloadStatus('processing');
-
-      pollDownloadStatus(taskId);
-    } catch (err) {
-      setDownloadStatus('error');
-      setError(err.response?.data?.error || 'Failed to start download');
-    }
-  };
-
-  const pollDownloadStatus = async (taskId) => {
-    const interval = setInterval(async () => {
-      try {
-        const response = await downloadsAPI.checkStatus(taskId);
-        const status = response.data.status;
-
-        if (status === 'ready') {
-          clearInterval(interval);
-          setDownloadStatus('ready');
-          window.location.href = downloadsAPI.downloadFile(taskId);
-          setTimeout(() => setDownloadStatus(null), 3000);
-        } else if (status === 'error') {
-          clearInterval(interval);
-          setDownloadStatus('error');
-          setError(response.data.error);
-        }
-      } catch (err) {
-        clearInterval(interval);
-        setDownloadStatus('error');
-      }
-    }, 2000);
-  };
-
   if (loading) {
     return (
       <Box display="flex" justifyContent="center" alignItems="center" minHeight="80vh">
@@ -138,10 +97,9 @@ const GalleryGrid = () => {
           <Button
             variant="contained"
             startIcon={<Download />}
-            onClick={handleDownloadGallery}
-            disabled={downloadStatus === 'requesting' || downloadStatus === 'processing'}
+            href={downloadsAPI.streamUrl(slug)}
           >
-            {downloadStatus === 'processing' ? 'Preparing...' : 'Download Gallery'}
+            Download Gallery
           </Button>
         )}
       </Box>
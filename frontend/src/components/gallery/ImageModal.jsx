@@ -12,7 +12,7 @@ const ImageModal = ({ open, onClose, image, galleryId, onNext, onPrevious, allow
 
   if (!image) return null;
 
-  const fullImageUrl = `/images/full/${galleryId}/${image.id}`;
+  const fullImageUrl = `/images/full/${galleryId}/${image.id}?v=${image.version}`;
 
   const handleKeyDown = (e) => {
     if (e.key === 'Escape') onClose();
@@ -64,7 +64,7 @@ const ImageModal = ({ open, onClose, image, galleryId, onNext, onPrevious, allow
           <IconButton
             component="a"
             href={fullImageUrl}
-            download={image.original_filename}
+            download
             sx={{ position: 'absolute', bottom: 8, right: 8, color: 'white', zIndex: 1 }}
           >
             <Download />
@@ -78,6 +78,8 @@ const ImageModal = ({ open, onClose, image, galleryId, onNext, onPrevious, allow
         )}
         <img
           src={fullImageUrl}
+          srcSet={image.srcset}
+          sizes="100vw"
           alt={image.original_filename}
           onLoad={() => setLoading(false)}
           style={{
@@ -1,12 +1,12 @@
 import { useRef } from 'react';
-import { Card, CardMedia, Skeleton } from '@mui/material';
+import { Box, Card, CardMedia, Skeleton } from '@mui/material';
 import { useLazyLoad } from '../../hooks/useLazyLoad';
 
 const ImageThumbnail = ({ image, galleryId, onClick }) => {
   const ref = useRef();
   const isVisible = useLazyLoad(ref);
 
-  const thumbnailUrl = `/images/thumbnails/${galleryId}/${image.id}?size=medium`;
+  const thumbnailUrl = `/images/thumbnails/${galleryId}/${image.id}?size=medium&v=${image.version}`;
 
   return (
     <Card
@@ -14,6 +14,10 @@ const ImageThumbnail = ({ image, galleryId, onClick }) => {
       onClick={onClick}
       sx={{
         cursor: 'pointer',
+        bgcolor: image.dominant_color,
+        backgroundImage: image.preview ? `url(${image.preview})` : undefined,
+        backgroundSize: 'cover',
+        backgroundPosition: 'center',
         transition: 'transform 0.2s',
         '&:hover': {
           transform: 'scale(1.05)',
@@ -26,10 +30,14 @@ const ImageThumbnail = ({ image, galleryId, onClick }) => {
           component="img"
           height="300"
           image={thumbnailUrl}
+          srcSet={image.srcset}
+          sizes="(min-width: 1200px) 25vw, (min-width: 900px) 33vw, (min-width: 600px) 50vw, 100vw"
           alt={image.original_filename}
           loading="lazy"
           sx={{ objectFit: 'cover' }}
         />
+      ) : image.preview ? (
+        <Box sx={{ height: 300, backdropFilter: 'blur(12px)' }} />
       ) : (
         <Skeleton variant="rectangular" height={300} />
       )}
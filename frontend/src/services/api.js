@@ -35,7 +35,7 @@ export const authAPI = {
 
 export const galleriesAPI = {
   listPublic: () => api.get('/galleries'),
-  getBySlug: (slug) => api.get(`/galleries/${slug}`),
+  getBySlug: (slug, params) => api.get(`/galleries/${slug}`, { params }),
   authenticate: (slug, password) => api.post(`/galleries/${slug}/authenticate`, { password }),
 
   listAll: () => api.get('/admin/galleries'),
@@ -45,28 +45,98 @@ export const galleriesAPI = {
   delete: (id) => api.delete(`/admin/galleries/${id}`)
 };
 
+const MAX_CHUNK_RETRIES = 5;
+
+// Hashing the whole file needs it in memory (SubtleCrypto has no incremental API), so larger
+// files send a digest with every chunk instead. Plain-HTTP hosts have no SubtleCrypto at all and
+// fall back to a single multipart request.
+const CLIENT_HASH_LIMIT = 32 * 1024 * 1024;
+
+const sha256Hex = async (blob) => {
+  const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+};
+
+export const uploadsAPI = {
+  create: (galleryId, data) => api.post(`/admin/galleries/${galleryId}/uploads`, data),
+  status: (galleryId, uploadId) => api.get(`/admin/galleries/${galleryId}/uploads/${uploadId}`),
+  putChunk: (galleryId, uploadId, offset, chunk, sha256) => api.put(
+    `/admin/galleries/${galleryId}/uploads/${uploadId}`,
+    chunk,
+    { params: { offset }, headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-SHA256': sha256 } }
+  ),
+  complete: (galleryId, uploadId) => api.post(`/admin/galleries/${galleryId}/uploads/${uploadId}/complete`)
+};
+
 export const imagesAPI = {
-  upload: (galleryId, file, onProgress) => {
+  upload: async (galleryId, file, onProgress) => {
+    if (!globalThis.crypto?.subtle) {
+      return imagesAPI.uploadFile(galleryId, file, onProgress);
+    }
+
+    const sha256 = file.size <= CLIENT_HASH_LIMIT ? await sha256Hex(file) : null;
+    const { data: session } = await uploadsAPI.create(
+      galleryId,
+      sha256 ? { filename: file.name, size: file.size, sha256 } : { filename: file.name, size: file.size }
+    );
+
+    let offset = session.duplicate ? file.size : session.offset;
+    let failures = 0;
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + session.chunk_size);
+      try {
+        const { data } = await uploadsAPI.putChunk(galleryId, session.upload_id, offset, chunk, await sha256Hex(chunk));
+        offset = data.offset;
+        failures = 0;
+      } catch (err) {
+        failures += 1;
+        if (failures > MAX_CHUNK_RETRIES) {
+          throw err;
+        }
+        const { data } = await uploadsAPI.status(galleryId, session.upload_id);
+        offset = data.offset;
+      }
+      onProgress?.({ loaded: offset, total: file.size });
+    }
+
+    return uploadsAPI.complete(galleryId, session.upload_id);
+  },
+  uploadFile: (galleryId, file, onProgress) => {
     const formData = new FormData();
     formData.append('file', file);
-
     return api.post(`/admin/galleries/${galleryId}/images`, formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
       onUploadProgress: onProgress
     });
   },
+  bulkUpload: (galleryId, files, onProgress) => {
+    const formData = new FormData();
+    files.forEach(file => formData.append('files', file));
+    return api.post(`/admin/galleries/${galleryId}/images/bulk`, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      onUploadProgress: onProgress
+    });
+  },
   delete: (id) => api.delete(`/admin/images/${id}`),
   updateVisibility: (id, isHidden) => api.put(`/admin/images/${id}/visibility`, { is_hidden: isHidden }),
-  updateOrder: (id, order) => api.put(`/admin/images/${id}/order`, { order })
+  updateOrder: (id, order) => api.put(`/admin/images/${id}/order`, { order }),
+  reorder: (galleryId, imageIds) => api.put(`/admin/galleries/${galleryId}/images/batch/order`, { image_ids: imageIds }),
+  batchVisibility: (galleryId, imageIds, isHidden) => api.put(
+    `/admin/galleries/${galleryId}/images/batch/visibility`,
+    { image_ids: imageIds, is_hidden: isHidden }
+  ),
+  batchDelete: (galleryId, imageIds) => api.post(`/admin/galleries/${galleryId}/images/batch/delete`, { image_ids: imageIds })
 };
 
 export const downloadsAPI = {
+  streamUrl: (slug) => `/api/galleries/${slug}/download`,
   requestZip: (slug) => api.post(`/galleries/${slug}/download`),
   checkStatus: (taskId) => api.get(`/downloads/${taskId}/status`),
+  cancel: (taskId) => api.delete(`/downloads/${taskId}`),
   downloadFile: (taskId) => `/api/downloads/${taskId}/file`
 };
 
 export const adminAPI = {
   getMetrics: () => api.get('/auth/admin/metrics'),
-  getAuditLogs: (page = 1, perPage = 50) => api.get('/auth/admin/audit-logs', { params: { page, per_page: perPage } })
+  getAuditLogs: (params = {}) => api.get('/auth/admin/audit-logs', { params })
 };